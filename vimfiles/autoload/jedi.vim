@@ -33,6 +33,7 @@ let s:default_settings = {
     \ 'popup_select_first': 1,
     \ 'quickfix_window_height': 10,
     \ 'completions_enabled': 1,
+    \ 'completions_timeout': 3000,
     \ 'force_py_version': "'auto'",
     \ 'smart_auto_mappings': 1,
     \ 'use_tag_stack': 1
@@ -240,6 +241,10 @@ function! jedi#completions(findstart, base)
     PythonJedi jedi_vim.completions()
 endfunction
 
+function! jedi#resolve_completion()
+    PythonJedi jedi_vim.resolve_completion()
+endfunction
+
 function! jedi#enable_speed_debugging()
     PythonJedi jedi_vim.jedi.set_debug_function(jedi_vim.print_to_stdout, speed=True, warnings=False, notices=False)
 endfunction
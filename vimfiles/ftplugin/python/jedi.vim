@@ -35,6 +35,12 @@ if g:jedi#auto_initialization
 
     if g:jedi#completions_enabled == 1
         inoremap <silent> <buffer> . .<C-R>=jedi#complete_string(1)<CR>
+        if exists('##CompleteChanged')
+            augroup jedi_resolve_completion
+                autocmd! * <buffer>
+                autocmd CompleteChanged <buffer> call jedi#resolve_completion()
+            augroup END
+        endif
     endif
 
     if g:jedi#smart_auto_mappings == 1
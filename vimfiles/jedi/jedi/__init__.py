@@ -39,5 +39,7 @@ good text editor, while still having very good IDE features for Python.
 __version__ = '0.9.0'
 
 from jedi.api import Script, Interpreter, NotFoundError, set_debug_function
-from jedi.api import preload_module, defined_names, names
+from jedi.api import EvaluationCancelled, RequestSettings
+from jedi.api import preload_module, defined_names, names, Session
+from jedi.api import warm_cache
 from jedi import settings
@@ -6,6 +6,29 @@ if len(argv) == 2 and argv[1] == 'repl':
     # don't want to use __main__ only for repl yet, maybe we want to use it for
     # something else. So just use the keyword ``repl`` for now.
     print(join(dirname(abspath(__file__)), 'api', 'replstartup.py'))
+elif len(argv) > 1 and argv[1] == 'warmup':
+    # Parses the given project directories and the sys.path ahead of time.
+    import sys
+    import jedi
+    from jedi.evaluate.sys_path import get_sys_path
+
+    processes = None
+    paths = []
+    args = iter(argv[2:])
+    for arg in args:
+        if arg == '--processes':
+            processes = int(next(args))
+        else:
+            paths.append(abspath(arg))
+
+    def progress(done, total, path):
+        sys.stderr.write('\r%s/%s modules parsed' % (done, total))
+        if done == total:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+    jedi.warm_cache((paths or [abspath('.')]) + get_sys_path(), processes,
+                    progress)
 elif len(argv) > 1 and argv[1] == 'linter':
     """
     This is a pre-alpha API. You're not supposed to use it at all, except for
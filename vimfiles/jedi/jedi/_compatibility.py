@@ -175,6 +175,15 @@ except ImportError:
     from itertools import izip_longest as zip_longest  # Python 2
 
 
+try:
+    intern_string = sys.intern
+except AttributeError:
+    # Python 2's ``intern`` only accepts byte strings, the parser works with
+    # unicode. Equal strings are not shared there.
+    def intern_string(string):
+        return string
+
+
 def no_unicode_pprint(dct):
     """
     Python 2/3 dict __repr__ may be different, because of unicode differens
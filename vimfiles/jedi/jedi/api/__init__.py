@@ -4,7 +4,10 @@ use its methods.
 
 Additionally you can add a debug function with :func:`set_debug_function`.
 
-.. warning:: Please, note that Jedi is **not thread safe**.
+Scripts can be evaluated in parallel threads as long as they don't share a
+:class:`.Session` and don't work on the same file at the same time. Settings
+that should only apply to one script can be passed as
+:class:`jedi.common.RequestSettings`.
 """
 import re
 import os
@@ -21,16 +24,19 @@ from jedi import debug
 from jedi import settings
 from jedi import common
 from jedi import cache
+from jedi.common import EvaluationCancelled, RequestSettings
 from jedi.api import keywords
 from jedi.api import classes
 from jedi.api import interpreter
 from jedi.api import usages
 from jedi.api import helpers
+from jedi.api.session import Session
+from jedi.api.warmup import warm_cache
 from jedi.evaluate import Evaluator
 from jedi.evaluate import representation as er
 from jedi.evaluate import compiled
 from jedi.evaluate import imports
-from jedi.evaluate.cache import memoize_default
+from jedi.evaluate import prefetch
 from jedi.evaluate.helpers import FakeName, get_module_names
 from jedi.evaluate.finder import global_names_dict_generator, filter_definition_names
 from jedi.evaluate import analysis
@@ -73,9 +79,24 @@ class Script(object):
     :param source_encoding: The encoding of ``source``, if it is not a
         ``unicode`` object (default ``'utf-8'``).
     :type encoding: str
+    :param session: Reuse the evaluator (and therefore its caches) of an
+        earlier request, see :class:`.Session`.
+    :type session: :class:`.Session`
+    :param is_cancelled: A callable that is checked between evaluation
+        steps. If it returns True, the running API call raises
+        :class:`jedi.common.EvaluationCancelled`.
+    :param deadline_ms: A time budget in milliseconds, counted from the
+        creation of the script. When it's used up, evaluation stops going
+        deeper and the API calls return what was found so far, see
+        :attr:`is_partial`.
+    :param request_settings: Settings for this script only, the others are
+        taken from :mod:`jedi.settings`.
+    :type request_settings: :class:`jedi.common.RequestSettings`
     """
     def __init__(self, source=None, line=None, column=None, path=None,
-                 encoding='utf-8', source_path=None, source_encoding=None):
+                 encoding='utf-8', source_path=None, source_encoding=None,
+                 session=None, is_cancelled=None, deadline_ms=None,
+                 request_settings=None):
         if source_path is not None:
             warnings.warn("Use path instead of source_path.", DeprecationWarning)
             path = source_path
@@ -104,15 +125,25 @@ class Script(object):
 
         cache.clear_time_caches()
         debug.reset_time()
-        self._grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+        if session is None:
+            self._grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+            self._evaluator = Evaluator(self._grammar)
+        else:
+            self._grammar = session.grammar
+            self._evaluator = session.get_evaluator(self.path)
+        self._evaluator.is_cancelled = is_cancelled
+        self._evaluator.set_deadline(deadline_ms)
+        if request_settings is None:
+            request_settings = common.RequestSettings()
+        self._evaluator.settings = request_settings
         self._user_context = UserContext(self.source, self._pos)
         self._parser = UserContextParser(self._grammar, self.source, path,
                                          self._pos, self._user_context,
                                          self._parsed_callback)
-        self._evaluator = Evaluator(self._grammar)
         debug.speed('init')
 
     def _parsed_callback(self, parser):
+        prefetch.prefetch_imports(parser.module)
         module = self._evaluator.wrap(parser.module)
         imports.add_module(self._evaluator, unicode(module.name), module)
 
@@ -129,6 +160,14 @@ class Script(object):
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, repr(self._orig_path))
 
+    @property
+    def is_partial(self):
+        """
+        True if the ``deadline_ms`` passed during evaluation. The results of
+        the API calls may be incomplete then.
+        """
+        return self._evaluator.is_partial
+
     def completions(self):
         """
         Return :class:`classes.Completion` objects. Those objects contain
@@ -211,7 +250,7 @@ class Script(object):
         comp_dct = {}
         for c in set(completion_names):
             n = str(c)
-            if settings.case_insensitive_completion \
+            if self._evaluator.settings.case_insensitive_completion \
                     and n.lower().startswith(like.lower()) \
                     or n.startswith(like):
                 if isinstance(c.parent, (tree.Function, tree.Class)):
@@ -220,7 +259,7 @@ class Script(object):
                     c = self._evaluator.wrap(c.parent).name
                 new = classes.Completion(self._evaluator, c, needs_dot, len(like))
                 k = (new.name, new.complete)  # key
-                if k in comp_dct and settings.no_completion_duplicates:
+                if k in comp_dct and self._evaluator.settings.no_completion_duplicates:
                     comp_dct[k]._same_name_completions.append(new)
                 else:
                     comp_dct[k] = new
@@ -299,7 +338,7 @@ class Script(object):
 
         return scopes
 
-    @memoize_default()
+    @cache.memoize_method
     def _get_under_cursor_stmt(self, cursor_txt, start_pos=None):
         tokenizer = source_tokens(cursor_txt)
         r = Parser(self._grammar, cursor_txt, tokenizer=tokenizer)
@@ -461,9 +500,7 @@ class Script(object):
 
         :rtype: list of :class:`classes.Definition`
         """
-        temp, settings.dynamic_flow_information = \
-            settings.dynamic_flow_information, False
-        try:
+        with self._evaluator.settings.changed(dynamic_flow_information=False):
             user_stmt = self._parser.user_stmt()
             definitions = self._goto(add_import_name=True)
             if not definitions and isinstance(user_stmt, tree.Import):
@@ -491,8 +528,6 @@ class Script(object):
 
             for d in set(definitions):
                 names.append(classes.Definition(self._evaluator, d))
-        finally:
-            settings.dynamic_flow_information = temp
 
         return helpers.sorted_definitions(set(names))
 
@@ -520,7 +555,9 @@ class Script(object):
         if stmt is None:
             return []
 
-        with common.scale_speed_settings(settings.scale_call_signatures):
+        request_settings = self._evaluator.settings
+        with common.scale_speed_settings(request_settings,
+                                         request_settings.scale_call_signatures):
             origins = cache.cache_call_signatures(self._evaluator, stmt,
                                                   self.source, self._pos)
         debug.speed('func_call followed')
@@ -8,7 +8,6 @@ from itertools import chain
 import re
 
 from jedi._compatibility import unicode, use_metaclass
-from jedi import settings
 from jedi import common
 from jedi.parser import tree
 from jedi.evaluate.cache import memoize_default, CachedMetaClass
@@ -16,6 +15,7 @@ from jedi.evaluate import representation as er
 from jedi.evaluate import iterable
 from jedi.evaluate import imports
 from jedi.evaluate import compiled
+from jedi.evaluate.compiled import stubs
 from jedi.api import keywords
 from jedi.evaluate.finder import filter_definition_names
 
@@ -200,7 +200,9 @@ class BaseDefinition(object):
 
     def in_builtin_module(self):
         """Whether this is a builtin module."""
-        return isinstance(self._module, compiled.CompiledObject)
+        # Compiled modules are either imported or stubbed.
+        return isinstance(self._module, compiled.CompiledObject) \
+            or stubs.is_extension(self._module.path)
 
     @property
     def line(self):
@@ -378,11 +380,11 @@ class Completion(BaseDefinition):
     def _complete(self, like_name):
         dot = '.' if self._needs_dot else ''
         append = ''
-        if settings.add_bracket_after_function \
+        if self._evaluator.settings.add_bracket_after_function \
                 and self.type == 'Function':
             append = '('
 
-        if settings.add_dot_after_module:
+        if self._evaluator.settings.add_dot_after_module:
             if isinstance(self._definition, tree.Module):
                 append += '.'
         if isinstance(self._definition, tree.Param):
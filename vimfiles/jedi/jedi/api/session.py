@@ -0,0 +1,68 @@
+"""
+A :class:`Session` keeps one :class:`jedi.evaluate.Evaluator` alive between
+:class:`jedi.Script` calls. This is useful for editors and completion servers
+that create a ``Script`` for every keystroke: modules that were imported once
+(``numpy``, ``django``, ...) don't need to be followed again.
+
+Modules are only forgotten if their file changed on disk. The module of the
+current buffer is always invalidated, because its source changes all the time.
+
+>>> from jedi import Script, Session
+>>> session = Session()
+>>> script = Script('import json; json.lo', session=session)
+>>> [c.name for c in script.completions()]
+['load', 'loads']
+
+A session must only be used by one thread at a time. Scripts that run in
+parallel threads need their own evaluators: use one session per editor thread
+(or no session at all).
+"""
+import os
+import sys
+
+from jedi import cache
+from jedi.parser import load_grammar
+from jedi.evaluate import Evaluator
+
+
+class Session(object):
+    def __init__(self):
+        self.grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+        self.evaluator = Evaluator(self.grammar)
+        # Only modules that changed are forgotten, the others are kept.
+        self.evaluator.memoize_cache.track_dependencies = True
+
+    def get_evaluator(self, path):
+        """
+        Returns the shared evaluator, prepared for a new request on the buffer
+        ``path``.
+        """
+        for p in list(self._changed_paths()):
+            self.invalidate(p)
+        self.invalidate(path)
+        self.evaluator.reset_recursion_limitations()
+        self.evaluator.analysis = []
+        return self.evaluator
+
+    def invalidate(self, path):
+        """
+        Forget the module at ``path``, e.g. because an editor knows that the
+        file was just written.
+        """
+        self.evaluator.invalidate_module(path)
+
+    def _changed_paths(self):
+        for module in self.evaluator.modules.values():
+            path = getattr(module, 'path', None)
+            if path is None:
+                continue
+            try:
+                change_time = cache.parser_cache[path].change_time
+            except KeyError:
+                continue
+            try:
+                if change_time is None or os.path.getmtime(path) > change_time:
+                    yield path
+            except OSError:
+                # The file has been deleted.
+                yield path
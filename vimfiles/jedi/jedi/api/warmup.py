@@ -0,0 +1,92 @@
+"""
+Parsing big libraries like ``numpy`` or ``django`` takes a few seconds the
+first time they are imported. :func:`warm_cache` parses all modules of a
+project and of the ``sys.path`` ahead of time in a process pool, and stores
+them in the file system cache (see :class:`jedi.cache.ParserPickling`).
+
+Modules that are already in the cache are skipped, so it's cheap to run it
+again, e.g. after installing a package. It's also available on the command
+line::
+
+    python -m jedi warmup [--processes N] [project directory ...]
+"""
+import os
+import multiprocessing
+
+from jedi import cache
+from jedi.evaluate.prefetch import parse_module
+from jedi.evaluate.sys_path import get_sys_path
+
+
+def warm_cache(paths=None, processes=None, progress=None):
+    """
+    Parses all Python files in ``paths`` and saves them in the file system
+    cache.
+
+    :param paths: Directories, the current directory and the ``sys.path`` by
+        default.
+    :param processes: Number of worker processes, one per CPU by default. With
+        ``1`` everything is parsed in this process.
+    :param progress: A callable ``progress(done, total, path)``, called after
+        each module.
+    :return: The number of parsed modules.
+    """
+    if paths is None:
+        paths = [os.getcwd()] + get_sys_path()
+
+    todo = []
+    for path in find_modules(paths):
+        try:
+            change_time = os.path.getmtime(path)
+        except OSError:
+            continue
+        if not cache.ParserPickling.is_up_to_date(path, change_time):
+            todo.append(path)
+
+    if processes is None:
+        try:
+            processes = multiprocessing.cpu_count()
+        except NotImplementedError:
+            processes = 1
+
+    pool = None
+    if processes == 1 or len(todo) < 2:
+        results = (parse_module(path) for path in todo)
+    else:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap_unordered(parse_module, todo, chunksize=8)
+
+    try:
+        # Only this process writes to the cache.
+        for i, (path, result) in enumerate(results, 1):
+            if result is not None:
+                cache.ParserPickling.save_pickled(path, *result)
+            if progress is not None:
+                progress(i, len(todo), path)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return len(todo)
+
+
+def find_modules(paths):
+    """
+    Yields the Python files in ``paths``. Files that are reachable from more
+    than one path (e.g. ``site-packages`` in the standard library) are only
+    yielded once.
+    """
+    seen = set()
+    for path in paths:
+        for root, dirnames, filenames in os.walk(path):
+            real_root = os.path.realpath(root)
+            if real_root in seen:
+                dirnames[:] = []
+                continue
+            seen.add(real_root)
+
+            dirnames[:] = [d for d in dirnames
+                           if not d.startswith('.') and d != '__pycache__']
+            for filename in filenames:
+                if filename.endswith('.py'):
+                    yield os.path.join(root, filename)
+
@@ -4,24 +4,29 @@ nothing really spectacular, just some decorators. The following cache types are
 available:
 
 - module caching (`load_parser` and `save_parser`), which uses pickle and is
-  really important to assure low load times of modules like ``numpy``.
+  really important to assure low load times of modules like ``numpy``. All
+  modules are stored in one memory mapped file, see :class:`ParserPickling`.
 - ``time_cache`` can be used to cache something for just a limited time span,
   which can be useful if there's user interaction and the user cannot react
   faster than a certain time.
 
-This module is one of the reasons why |jedi| is not thread-safe. As you can see
-there are global variables, which are holding the cache information. Some of
-these variables are being cleaned after every API usage.
+The caches are global and shared by all threads. Some of them are being
+cleaned after every API usage. Changing them is guarded by :data:`lock`.
 """
 import time
 import os
+import functools
+import threading
 import sys
 import json
 import hashlib
 import gc
 import inspect
+import mmap
 import shutil
+import struct
 import re
+import zlib
 try:
     import cPickle as pickle
 except ImportError:
@@ -33,18 +38,35 @@ from jedi import debug
 
 _time_caches = {}
 
+lock = threading.RLock()
+"""
+Held while the parser caches (in memory and on disk) are read or changed.
+It's reentrant, because the caches call each other.
+"""
+
 # for fast_parser, should not be deleted
 parser_cache = {}
 
 
+def synchronized(func):
+    """Holds :data:`lock` while ``func`` runs."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
 class ParserCacheItem(object):
-    def __init__(self, parser, change_time=None):
+    def __init__(self, parser, change_time=None, source_hash=None):
         self.parser = parser
         if change_time is None:
             change_time = time.time()
         self.change_time = change_time
+        self.source_hash = source_hash
 
 
+@synchronized
 def clear_time_caches(delete_all=False):
     """ Jedi caches many things, that should be completed after each completion
     finishes.
@@ -65,7 +87,7 @@ def clear_time_caches(delete_all=False):
             for key, (t, value) in list(tc.items()):
                 if t < time.time():
                     # delete expired entries
-                    del tc[key]
+                    tc.pop(key, None)
 
 
 def time_cache(time_add_setting):
@@ -75,6 +97,9 @@ def time_cache(time_add_setting):
     use the function with a callable that returns the key.
     But: This function is only called if the key is not available. After a
     certain amount of time (`time_add_setting`) the cache is invalid.
+
+    The cache is read and written while holding :data:`lock`, the value itself
+    is calculated without it.
     """
     def _temp(key_func):
         dct = {}
@@ -83,17 +108,19 @@ def time_cache(time_add_setting):
         def wrapper(*args, **kwargs):
             generator = key_func(*args, **kwargs)
             key = next(generator)
-            try:
-                expiry, value = dct[key]
-                if expiry > time.time():
-                    return value
-            except KeyError:
-                pass
+            with lock:
+                try:
+                    expiry, value = dct[key]
+                    if expiry > time.time():
+                        return value
+                except KeyError:
+                    pass
 
             value = next(generator)
             time_add = getattr(settings, time_add_setting)
             if key is not None:
-                dct[key] = time.time() + time_add, value
+                with lock:
+                    dct[key] = time.time() + time_add, value
             return value
         return wrapper
     return _temp
@@ -101,7 +128,11 @@ def time_cache(time_add_setting):
 
 @time_cache("call_signatures_validity")
 def cache_call_signatures(evaluator, call, source, user_pos):
-    """This function calculates the cache key."""
+    """
+    This function calculates the cache key. Scripts of the same thread with
+    the same request settings share the results, an evaluator is never used
+    by two threads at once.
+    """
     index = user_pos[0] - 1
     lines = common.splitlines(source)
 
@@ -111,7 +142,11 @@ def cache_call_signatures(evaluator, call, source, user_pos):
     before_bracket = re.match(r'.*\(', whole, re.DOTALL)
 
     module_path = call.get_parent_until().path
-    yield None if module_path is None else (module_path, before_bracket, call.start_pos)
+    if before_bracket is not None:
+        before_bracket = before_bracket.group()
+    yield None if module_path is None \
+        else (threading.current_thread().ident, evaluator.settings.overrides(),
+              module_path, before_bracket, call.start_pos)
     yield evaluator.eval_element(call)
 
 
@@ -173,14 +208,10 @@ def cache_star_import(func):
 
 def _invalidate_star_import_cache_module(module, only_main=False):
     """ Important if some new modules are being reparsed """
-    try:
-        t, modules = _time_caches['star_import_cache_validity'][module]
-    except KeyError:
-        pass
-    else:
-        del _time_caches['star_import_cache_validity'][module]
+    _time_caches.get('star_import_cache_validity', {}).pop(module, None)
 
 
+@synchronized
 def invalidate_star_import_cache(path):
     """On success returns True."""
     try:
@@ -191,6 +222,7 @@ def invalidate_star_import_cache(path):
         _invalidate_star_import_cache_module(parser_cache_item.parser.module)
 
 
+@synchronized
 def load_parser(path):
     """
     Returns the module or None, if it fails.
@@ -200,6 +232,9 @@ def load_parser(path):
         parser_cache_item = parser_cache[path]
         if not path or p_time <= parser_cache_item.change_time:
             return parser_cache_item.parser
+        elif _is_source_unchanged(path, parser_cache_item.source_hash):
+            parser_cache_item.change_time = p_time
+            return parser_cache_item.parser
         else:
             # In case there is already a module cached and this module
             # has to be reparsed, we also need to invalidate the import
@@ -210,22 +245,74 @@ def load_parser(path):
             return ParserPickling.load_parser(path, p_time)
 
 
-def save_parser(path, parser, pickling=True):
+@synchronized
+def save_parser(path, parser, pickling=True, source=None):
+    """
+    ``source`` are the bytes of ``path`` the parser got, if they were read
+    already. They are hashed instead of reading the file again.
+    """
     try:
         p_time = None if path is None else os.path.getmtime(path)
     except OSError:
         p_time = None
         pickling = False
 
-    item = ParserCacheItem(parser, p_time)
+    source_hash = None
+    if pickling and settings.check_source_hash:
+        if isinstance(source, bytes):
+            source_hash = hash_source(source)
+        else:
+            source_hash = _source_hash(path)
+    item = ParserCacheItem(parser, p_time, source_hash)
     parser_cache[path] = item
     if settings.use_filesystem_cache and pickling:
         ParserPickling.save_parser(path, item)
 
 
+def hash_source(source):
+    """
+    The hash of the bytes of a module, see ``settings.check_source_hash``.
+    """
+    return hashlib.md5(source).hexdigest()
+
+
+def _source_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hash_source(f.read())
+    except IOError:
+        return None
+
+
+def _is_source_unchanged(path, source_hash):
+    """
+    Only the modification time of ``path`` changed, the content is the same.
+    """
+    return settings.check_source_hash and source_hash is not None \
+        and source_hash == _source_hash(path)
+
+
+def _path_digest(path):
+    return hashlib.md5(path.encode('utf-8')).digest()
+
+
+def _crc32(data):
+    return zlib.crc32(data) & 0xffffffff
+
+
 class ParserPickling(object):
+    """
+    All modules are stored in one append-only data file, which is memory
+    mapped. An append-only index file maps the module paths to the offsets of
+    their records. Saving a module therefore doesn't rewrite anything and
+    loading a module only unpickles that one module.
+
+    Other processes may use the same files. The index is read incrementally
+    and a record is only used if it really belongs to the module that was
+    asked for.
+    """
 
-    version = 24
+    version = 32
     """
     Version number (integer) for file system cache.
 
@@ -238,8 +325,25 @@ class ParserPickling(object):
     - Defined slot of the class is changed.
     """
 
+    compact_threshold = 64 * 1024 * 1024
+    """
+    The data file is compacted if outdated records use more bytes than this
+    and more than half of the file.
+    """
+
+    _record_header = struct.Struct('<II16s')
+    """
+    Every record starts with the length and crc32 of the pickle and the md5
+    digest of the module path.
+    """
+
     def __init__(self):
         self.__index = None
+        self.__index_position = 0
+        self.__index_inode = None
+        self.__directory = None
+        self.__data = None
+        self._outdated_bytes = 0
         self.py_tag = 'cpython-%s%s' % sys.version_info[:2]
         """
         Short name for distinguish Python implementations and versions.
@@ -251,77 +355,213 @@ class ParserPickling(object):
         .. todo:: Detect interpreter (e.g., PyPy).
         """
 
+    @synchronized
     def load_parser(self, path, original_changed_time):
         try:
-            pickle_changed_time = self._index[path]
+            pickle_changed_time, offset, length, source_hash = self._index[path]
         except KeyError:
             return None
-        if original_changed_time is not None \
-                and pickle_changed_time < original_changed_time:
+        touched = original_changed_time is not None \
+            and pickle_changed_time < original_changed_time
+        if touched and not _is_source_unchanged(path, source_hash):
             # the pickle file is outdated
             return None
 
-        with open(self._get_hashed_path(path), 'rb') as f:
-            try:
-                gc.disable()
-                parser_cache_item = pickle.load(f)
-            finally:
-                gc.enable()
+        data = self._read_record(path, offset, length)
+        if data is None:
+            return None
+        try:
+            gc.disable()
+            parser_cache_item = pickle.loads(data)
+        finally:
+            gc.enable()
+
+        if touched:
+            # Next time the modification time is enough again.
+            parser_cache_item.change_time = original_changed_time
+            self._append_index([(path, original_changed_time, offset, length,
+                                 source_hash)])
 
         debug.dbg('pickle loaded: %s', path)
         parser_cache[path] = parser_cache_item
         return parser_cache_item.parser
 
+    @synchronized
     def save_parser(self, path, parser_cache_item):
-        self.__index = None
+        data = pickle.dumps(parser_cache_item, pickle.HIGHEST_PROTOCOL)
+        self.save_pickled(path, parser_cache_item.change_time,
+                          parser_cache_item.source_hash, data)
+
+    @synchronized
+    def save_pickled(self, path, change_time, source_hash, data):
+        """
+        Saves a :class:`ParserCacheItem` that was already pickled, e.g. by
+        another process.
+        """
+        self._index  # Create the index (or clear an incompatible cache).
+        header = self._record_header.pack(len(data), _crc32(data),
+                                          _path_digest(path))
+        with open(self._get_path('data.bin'), 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(header + data)
+
+        self._append_index([(path, change_time, offset, len(data),
+                             source_hash)])
+        self._index  # Read the new entry.
+        size = offset + len(header) + len(data)
+        if self._outdated_bytes > max(self.compact_threshold, size // 2):
+            self._compact()
+
+    @synchronized
+    def is_up_to_date(self, path, change_time):
         try:
-            files = self._index
+            return self._index[path][0] >= change_time
         except KeyError:
-            files = {}
-            self._index = files
-
-        with open(self._get_hashed_path(path), 'wb') as f:
-            pickle.dump(parser_cache_item, f, pickle.HIGHEST_PROTOCOL)
-            files[path] = parser_cache_item.change_time
-
-        self._flush_index()
+            return False
 
     @property
     def _index(self):
-        if self.__index is None:
-            try:
-                with open(self._get_path('index.json')) as f:
-                    data = json.load(f)
-            except (IOError, ValueError):
-                self.__index = {}
-            else:
-                # 0 means version is not defined (= always delete cache):
-                if data.get('version', 0) != self.version:
-                    self.clear_cache()
-                    self.__index = {}
-                else:
-                    self.__index = data['index']
+        directory = self._cache_directory()
+        index_path = self._get_path('index.log')
+        try:
+            stat = os.stat(index_path)
+        except OSError:
+            stat = None
+        if self.__index is None or directory != self.__directory \
+                or stat is None or stat.st_ino != self.__index_inode \
+                or stat.st_size < self.__index_position:
+            # The index is new or has been replaced, read all of it.
+            if self.__index is None \
+                    and os.path.exists(self._get_path('index.json')):
+                # The cache of an older Jedi with one pickle per module.
+                self.clear_cache()
+            self._close_data()
+            self.__index = {}
+            self.__index_position = 0
+            self.__index_inode = None if stat is None else stat.st_ino
+            self.__directory = directory
+            self._outdated_bytes = 0
+        if stat is not None and stat.st_size > self.__index_position:
+            self._read_index(index_path)
         return self.__index
 
-    def _remove_old_modules(self):
-        # TODO use
-        change = False
-        if change:
-            self._flush_index(self)
-            self._index  # reload index
-
-    def _flush_index(self):
-        data = {'version': self.version, 'index': self._index}
-        with open(self._get_path('index.json'), 'w') as f:
-            json.dump(data, f)
-        self.__index = None
+    def _read_index(self, index_path):
+        incompatible = False
+        with open(index_path, 'rb') as f:
+            f.seek(self.__index_position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Another process is still writing this entry.
+                self.__index_position += len(line)
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    # 0 means version is not defined (= always delete cache):
+                    incompatible = entry.get('version', 0) != self.version
+                    if incompatible:
+                        break
+                    continue
+
+                path, change_time, offset, length, source_hash = entry
+                try:
+                    old_offset, old_length = self.__index[path][1:3]
+                except KeyError:
+                    pass
+                else:
+                    if old_offset != offset:
+                        self._outdated_bytes += old_length
+                self.__index[path] = change_time, offset, length, source_hash
+
+        if incompatible:
+            self.clear_cache()
+            self.__index = {}
+            self.__index_inode = None
+            self.__index_position = 0
+
+    def _append_index(self, entries, file_name='index.log'):
+        with open(self._get_path(file_name), 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            lines = [json.dumps(e) for e in entries]
+            if f.tell() == 0:
+                lines.insert(0, json.dumps({'version': self.version}))
+            f.write(''.join(l + '\n' for l in lines).encode('utf-8'))
+
+    def _read_record(self, path, offset, length, remap=True):
+        header_size = self._record_header.size
+        end = offset + header_size + length
+        if self.__data is None or len(self.__data) < end:
+            self._map_data()
+            remap = False
+        if self.__data is None:
+            # Not mappable (e.g. too large on a 32 bit system), just read it.
+            try:
+                with open(self._get_path('data.bin'), 'rb') as f:
+                    f.seek(offset)
+                    record = f.read(end - offset)
+            except IOError:
+                return None
+        else:
+            record = self.__data[offset:end]
+
+        payload = record[header_size:]
+        if len(payload) == length and record[:header_size] == \
+                self._record_header.pack(length, _crc32(payload),
+                                         _path_digest(path)):
+            return payload
+        if remap:
+            # The data file might have been replaced by another process.
+            self._close_data()
+            return self._read_record(path, offset, length, remap=False)
+        return None
+
+    def _map_data(self):
+        self._close_data()
+        try:
+            with open(self._get_path('data.bin'), 'rb') as f:
+                self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (EnvironmentError, ValueError, OverflowError):
+            # ValueError: The file is empty.
+            self.__data = None
+
+    def _close_data(self):
+        if self.__data is not None:
+            self.__data.close()
+            self.__data = None
+
+    def _compact(self):
+        """
+        Rewrites the data file without the records of outdated modules.
+        """
+        entries = []
+        suffix = '.%s.tmp' % os.getpid()
+        with open(self._get_path('data.bin' + suffix), 'wb') as f:
+            for path, entry in self._index.items():
+                change_time, offset, length, source_hash = entry
+                data = self._read_record(path, offset, length)
+                if data is not None:
+                    entries.append((path, change_time, f.tell(), length,
+                                    source_hash))
+                    f.write(self._record_header.pack(
+                        length, _crc32(data), _path_digest(path)) + data)
+        self._append_index(entries, 'index.log' + suffix)
+
+        self._close_data()
+        for name in 'data.bin', 'index.log':
+            try:
+                _replace(self._get_path(name + suffix), self._get_path(name))
+            except OSError:
+                os.remove(self._get_path(name + suffix))
+        debug.dbg('compacted the parser cache: %s', self._cache_directory())
 
+    @synchronized
     def clear_cache(self):
+        self._close_data()
+        self.__index = None
         shutil.rmtree(self._cache_directory())
 
-    def _get_hashed_path(self, path):
-        return self._get_path('%s.pkl' % hashlib.md5(path.encode("utf-8")).hexdigest())
-
     def _get_path(self, file):
         dir = self._cache_directory()
         if not os.path.exists(dir):
@@ -332,5 +572,10 @@ class ParserPickling(object):
         return os.path.join(settings.cache_directory, self.py_tag)
 
 
+# ``os.replace`` doesn't exist in Python 2, where ``os.rename`` only replaces
+# files on POSIX systems.
+_replace = getattr(os, 'replace', os.rename)
+
+
 # is a singleton
 ParserPickling = ParserPickling()
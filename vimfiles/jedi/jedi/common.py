@@ -3,6 +3,7 @@ import sys
 import contextlib
 import functools
 import re
+import threading
 from ast import literal_eval
 
 from jedi._compatibility import unicode, reraise
@@ -22,6 +23,14 @@ class UncaughtAttributeError(Exception):
     """
 
 
+class EvaluationCancelled(Exception):
+    """
+    Raised during evaluation if the ``is_cancelled`` callback of a
+    :class:`jedi.Script` returns True. The request has been abandoned by the
+    caller, nothing is cached.
+    """
+
+
 def safe_property(func):
     return property(reraise_uncaught(func))
 
@@ -56,6 +65,12 @@ def reraise_uncaught(func):
     return wrapper
 
 
+sys_path_lock = threading.RLock()
+"""
+Held while ``sys.path`` is replaced to find or import a module.
+"""
+
+
 class PushBackIterator(object):
     def __init__(self, iterator):
         self.pushes = []
@@ -80,17 +95,47 @@ class PushBackIterator(object):
         return self.current
 
 
-@contextlib.contextmanager
-def scale_speed_settings(factor):
-    a = settings.max_executions
-    b = settings.max_until_execution_unique
-    settings.max_executions *= factor
-    settings.max_until_execution_unique *= factor
-    try:
-        yield
-    finally:
-        settings.max_executions = a
-        settings.max_until_execution_unique = b
+class RequestSettings(object):
+    """
+    The settings of one request. Settings that are not given fall back to
+    :mod:`jedi.settings`. Changing them only affects the request, therefore
+    scripts with different settings can be evaluated in parallel threads.
+
+    >>> request_settings = RequestSettings(dynamic_flow_information=False)
+    >>> request_settings.dynamic_flow_information
+    False
+    """
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        return getattr(settings, name)
+
+    def overrides(self):
+        """The settings that differ from :mod:`jedi.settings`, hashable."""
+        return tuple(sorted(self.__dict__.items()))
+
+    @contextlib.contextmanager
+    def changed(self, **values):
+        """Changes settings of the request in a ``with`` block."""
+        old = dict((name, self.__dict__[name]) for name in values
+                   if name in self.__dict__)
+        self.__dict__.update(values)
+        try:
+            yield
+        finally:
+            for name in values:
+                if name in old:
+                    self.__dict__[name] = old[name]
+                else:
+                    del self.__dict__[name]
+
+
+def scale_speed_settings(request_settings, factor):
+    return request_settings.changed(
+        max_executions=request_settings.max_executions * factor,
+        max_until_execution_unique=request_settings.max_until_execution_unique * factor
+    )
 
 
 def indent_block(text, indention='    '):
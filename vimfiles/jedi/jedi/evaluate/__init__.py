@@ -61,15 +61,17 @@ that are not used are just being ignored.
 """
 
 import copy
+import time
 from itertools import chain
 
 from jedi.parser import tree
 from jedi import debug
+from jedi import common
 from jedi.evaluate import representation as er
 from jedi.evaluate import imports
 from jedi.evaluate import recursion
 from jedi.evaluate import iterable
-from jedi.evaluate.cache import memoize_default
+from jedi.evaluate.cache import memoize_default, MemoizeCache
 from jedi.evaluate import stdlib
 from jedi.evaluate import finder
 from jedi.evaluate import compiled
@@ -81,13 +83,69 @@ from jedi.evaluate import helpers
 class Evaluator(object):
     def __init__(self, grammar):
         self.grammar = grammar
-        self.memoize_cache = {}  # for memoize decorators
+        self.memoize_cache = MemoizeCache()  # for memoize decorators
         # To memorize modules -> equals `sys.modules`.
         self.modules = {}  # like `sys.modules`.
         self.compiled_cache = {}  # see `compiled.create()`
+        self.reset_recursion_limitations()
+        self.analysis = []
+        self.is_cancelled = None  # A callable, see `check_cancelled`.
+        self.deadline = None  # A `time.time()` value, see `set_deadline`.
+        # The settings of the current request, see `common.RequestSettings`.
+        self.settings = common.RequestSettings()
+
+    def reset_recursion_limitations(self):
+        """
+        The recursion detectors count executions over the whole lifetime of
+        the evaluator. An evaluator that is reused for several requests (see
+        :class:`jedi.api.session.Session`) needs fresh ones for every request.
+        """
         self.recursion_detector = recursion.RecursionDetector()
         self.execution_recursion_detector = recursion.ExecutionRecursionDetector()
-        self.analysis = []
+
+    def check_cancelled(self):
+        """
+        Called between evaluation steps. Raises
+        :class:`jedi.common.EvaluationCancelled` if the request was cancelled.
+        """
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise common.EvaluationCancelled()
+
+    def set_deadline(self, deadline_ms):
+        """
+        Evaluation stops going deeper ``deadline_ms`` milliseconds from now,
+        the results found until then are returned. ``None`` means no deadline.
+        """
+        self.memoize_cache.partial = False
+        if deadline_ms is None:
+            self.deadline = None
+        else:
+            self.deadline = time.time() + deadline_ms / 1000.0
+
+    def deadline_exceeded(self):
+        """
+        Called between evaluation steps. Marks the results as partial if the
+        deadline passed, the step has to be skipped then.
+        """
+        if self.deadline is not None and time.time() > self.deadline:
+            self.memoize_cache.cut_short()
+            return True
+        return False
+
+    @property
+    def is_partial(self):
+        """True if the deadline cut the evaluation short."""
+        return self.memoize_cache.partial
+
+    def invalidate_module(self, path):
+        """
+        Forget the module at ``path`` (``None`` for modules without a file)
+        and everything that was evaluated with its help.
+        """
+        for name, module in list(self.modules.items()):
+            if getattr(module, 'path', None) == path:
+                del self.modules[name]
+        self.memoize_cache.invalidate_module(path)
 
     def wrap(self, element):
         if isinstance(element, tree.Class):
@@ -159,6 +217,9 @@ class Evaluator(object):
 
     @memoize_default(evaluator_is_first_arg=True)
     def eval_element(self, element):
+        self.check_cancelled()
+        if self.deadline_exceeded():
+            return []
         if isinstance(element, iterable.AlreadyEvaluated):
             return list(element)
         elif isinstance(element, iterable.MergedNodes):
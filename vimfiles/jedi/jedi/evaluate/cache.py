@@ -2,11 +2,119 @@
 - the popular ``memoize_default`` works like a typical memoize and returns the
   default otherwise.
 - ``CachedMetaClass`` uses ``memoize_default`` to do the same with classes.
+- ``MemoizeCache`` is the storage of both. If the evaluator belongs to a
+  :class:`jedi.Session`, it remembers which modules a result was derived from,
+  so that results can be invalidated module by module.
 """
 
 import inspect
+from itertools import chain
+
+from jedi.parser import tree
+from jedi.common import EvaluationCancelled
 
 NO_DEFAULT = object()
+_NO_MODULE = object()
+
+
+def _get_module_path(obj):
+    """
+    Returns the path of the module ``obj`` was parsed from, or ``_NO_MODULE``
+    for things like compiled objects that are not part of a parser tree.
+    """
+    # Evaluation wrappers like ``er.Instance`` or ``er.Class`` are based on
+    # parser nodes.
+    while not isinstance(obj, (tree.BaseNode, tree.Leaf)):
+        try:
+            obj = obj.base
+        except AttributeError:
+            return _NO_MODULE
+    module = obj.get_parent_until()
+    if isinstance(module, tree.Module):
+        return module.path
+    return _NO_MODULE
+
+
+class MemoizeCache(dict):
+    """
+    Maps functions to their memoized results, ``{function: {key: result}}``.
+
+    While a memoized function runs, all the modules it touches are collected:
+    the modules of its arguments and results, as well as the dependencies of
+    all the memoized functions it calls. This makes it possible to drop exactly
+    the results that depend on a module with :meth:`invalidate_module`.
+
+    The tracking is only done if ``track_dependencies`` is set, otherwise
+    :meth:`invalidate_module` drops everything. An evaluator that is used for
+    a single ``Script`` is thrown away anyway, only sessions need it.
+
+    Results whose calculation was cut short by a deadline (see
+    :meth:`cut_short`) are not stored, they might be incomplete. Everything
+    else is still memoized after the deadline.
+    """
+    def __init__(self, track_dependencies=False):
+        super(MemoizeCache, self).__init__()
+        self.track_dependencies = track_dependencies
+        self.partial = False
+        self.cut_steps = 0  # The evaluation steps skipped after a deadline.
+        self._dependencies = {}  # (function, key) -> set of module paths
+        self._dependents = {}  # module path -> set of (function, key)
+        self._collecting = []
+
+    def cut_short(self):
+        """An evaluation step is skipped, because the deadline passed."""
+        self.partial = True
+        self.cut_steps += 1
+
+    def push(self):
+        self._collecting.append(set())
+
+    def pop(self, function, key, arguments, result):
+        """
+        Stops collecting for the function call that was started last and
+        stores the dependencies of its result.
+        """
+        paths = self._collecting.pop()
+        if not isinstance(result, (list, set, tuple)):
+            result = [result]
+        for obj in chain(arguments, result):
+            paths.add(_get_module_path(obj))
+        paths.discard(_NO_MODULE)
+
+        entry = function, key
+        self._dependencies[entry] = paths
+        for path in paths:
+            self._dependents.setdefault(path, set()).add(entry)
+        if self._collecting:
+            self._collecting[-1] |= paths
+
+    def add_used(self, function, key):
+        """A memoized result is used, the caller depends on it as well."""
+        if self._collecting:
+            try:
+                self._collecting[-1] |= self._dependencies[function, key]
+            except KeyError:
+                # The result is still being calculated (recursion).
+                pass
+
+    def invalidate_module(self, path):
+        """
+        Removes all results that were derived from the module at ``path``.
+        """
+        if not self.track_dependencies:
+            self.clear()
+            return
+        for entry in self._dependents.pop(path, ()):
+            function, key = entry
+            self[function].pop(key, None)
+            for other_path in self._dependencies.pop(entry, ()):
+                if other_path != path:
+                    self._dependents.get(other_path, set()).discard(entry)
+
+    def clear(self):
+        super(MemoizeCache, self).clear()
+        self._dependencies.clear()
+        self._dependents.clear()
 
 
 def memoize_default(default=NO_DEFAULT, evaluator_is_first_arg=False, second_arg_is_evaluator=False):
@@ -34,14 +142,31 @@ def memoize_default(default=NO_DEFAULT, evaluator_is_first_arg=False, second_arg
 
             key = (obj, args, frozenset(kwargs.items()))
             if key in memo:
+                if cache.track_dependencies:
+                    cache.add_used(function, key)
                 return memo[key]
             else:
                 if default is not NO_DEFAULT:
                     memo[key] = default
-                rv = function(obj, *args, **kwargs)
-                if inspect.isgenerator(rv):
-                    rv = list(rv)
-                memo[key] = rv
+                tracking = cache.track_dependencies
+                if tracking:
+                    cache.push()
+                cut_steps = cache.cut_steps
+                try:
+                    rv = function(obj, *args, **kwargs)
+                    if inspect.isgenerator(rv):
+                        rv = list(rv)
+                    if cache.cut_steps != cut_steps:
+                        memo.pop(key, None)
+                    else:
+                        memo[key] = rv
+                except EvaluationCancelled:
+                    # Don't keep the default, the result is not known.
+                    memo.pop(key, None)
+                    raise
+                finally:
+                    if tracking:
+                        cache.pop(function, key, chain([obj], args), memo.get(key))
                 return rv
         return wrapper
     return func
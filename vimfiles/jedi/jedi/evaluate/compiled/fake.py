@@ -23,16 +23,10 @@ def _load_faked_module(module):
     try:
         return modules[module_name]
     except KeyError:
-        path = os.path.dirname(os.path.abspath(__file__))
-        try:
-            with open(os.path.join(path, 'fake', module_name) + '.pym') as f:
-                source = f.read()
-        except IOError:
-            modules[module_name] = None
-            return
-        grammar = load_grammar('grammar3.4')
-        module = Parser(grammar, unicode(source), module_name).module
+        module = parse_faked_module(module_name)
         modules[module_name] = module
+        if module is None:
+            return
 
         if module_name == 'builtins' and not is_py3:
             # There are two implementations of `open` for either python 2/3.
@@ -44,6 +38,21 @@ def _load_faked_module(module):
         return module
 
 
+def parse_faked_module(module_name):
+    """
+    Returns a new tree of the faked module ``module_name`` or None if there is
+    none.
+    """
+    path = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(os.path.join(path, 'fake', module_name) + '.pym') as f:
+            source = f.read()
+    except IOError:
+        return None
+    grammar = load_grammar('grammar3.4')
+    return Parser(grammar, unicode(source), module_name).module
+
+
 def search_scope(scope, obj_name):
     for s in scope.subscopes:
         if str(s.name) == obj_name:
@@ -109,9 +118,10 @@ def get_faked(module, obj, name=None):
         doc = '"""%s"""' % obj.__doc__  # TODO need escapes.
         suite = result.children[-1]
         string = pt.String(pt.zero_position_modifier, doc, (0, 0), '')
-        new_line = pt.Whitespace('\n', (0, 0), '')
+        new_line = pt.Whitespace(pt.zero_position_modifier, '\n', (0, 0), '')
         docstr_node = pt.Node('simple_stmt', [string, new_line])
         suite.children.insert(2, docstr_node)
+        result.clear_scope_index()
         return result
 
 
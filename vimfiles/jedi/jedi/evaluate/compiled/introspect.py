@@ -0,0 +1,197 @@
+"""
+Describes a compiled module as JSON. This file is run as a script in a
+throwaway process (see :mod:`jedi.evaluate.compiled.stubs`), therefore it
+doesn't import |jedi| and works with every Python version |jedi| supports.
+
+The request is read from stdin: ``{"name": dotted name or null, "path": path
+of the extension, "sys_path": [...]}``. The description of the module is
+written to stdout::
+
+    {"name": ..., "doc": ..., "members": [member, ...]}
+
+Every member has a ``name`` and a ``kind``:
+
+- ``class``: ``doc``, ``bases`` (references) and ``members``.
+- ``function``, ``method``, ``classmethod``, ``staticmethod``: ``doc`` and
+  ``params``, a list of ``[name, stars, default]`` or null if the signature
+  is unknown.
+- ``property``: ``doc``.
+- ``module``: ``module``, the dotted name of the module.
+- ``alias``: ``ref``, a reference to a class or function of another module.
+- ``value``: either ``literal`` (the repr) or ``type`` (a reference).
+
+References are ``[module name, qualified name]``.
+"""
+import inspect
+import json
+import os
+import sys
+
+try:
+    unicode
+except NameError:
+    unicode = str
+
+_MAX_DEPTH = 3
+_LITERAL_TYPES = (bool, int, float, complex, str, bytes, unicode, type(None))
+_SKIP_MODULE = set(['__builtins__', '__cached__', '__doc__', '__file__',
+                    '__loader__', '__name__', '__package__', '__path__',
+                    '__spec__'])
+_SKIP_CLASS = set(['__dict__', '__doc__', '__module__', '__qualname__',
+                   '__slots__', '__weakref__'])
+
+
+def _doc(obj):
+    try:
+        doc = inspect.getdoc(obj)
+    except Exception:
+        return None
+    return doc if isinstance(doc, (str, unicode)) else None
+
+
+def _literal(obj):
+    if type(obj) in _LITERAL_TYPES:
+        r = repr(obj)
+        if len(r) < 200:
+            return r
+    return None
+
+
+def _qualname(obj):
+    return getattr(obj, '__qualname__', None) or obj.__name__
+
+
+def _reference(obj):
+    try:
+        return [obj.__module__, _qualname(obj)]
+    except Exception:
+        return None
+
+
+def _is_importable(ref, obj):
+    try:
+        found = sys.modules[ref[0]]
+        for part in ref[1].split('.'):
+            found = getattr(found, part)
+    except Exception:
+        return False
+    return found is obj
+
+
+def _params(func):
+    try:
+        signature = inspect.signature(func)
+    except Exception:  # Python 2 or no signature (ValueError, TypeError)
+        return None
+    params = []
+    for p in signature.parameters.values():
+        stars = {p.VAR_POSITIONAL: '*', p.VAR_KEYWORD: '**'}.get(p.kind, '')
+        default = None
+        if p.default is not p.empty:
+            default = _literal(p.default) or 'None'
+        params.append([p.name, stars, default])
+    return params
+
+
+def _function(name, kind, obj, signature_obj=None):
+    return {'name': name, 'kind': kind, 'doc': _doc(obj),
+            'params': _params(obj if signature_obj is None else signature_obj)}
+
+
+def _value(name, obj):
+    literal = _literal(obj)
+    if literal is not None:
+        return {'name': name, 'kind': 'value', 'literal': literal}
+    return {'name': name, 'kind': 'value', 'type': _reference(type(obj))}
+
+
+def _class(name, cls, module_name, depth):
+    members = []
+    if depth < _MAX_DEPTH:
+        for key, raw in sorted(vars(cls).items()):
+            if key in _SKIP_CLASS:
+                continue
+            try:
+                members.append(_class_member(key, raw, cls, module_name, depth))
+            except Exception:
+                pass
+    bases = [_reference(b) for b in getattr(cls, '__bases__', ())]
+    return {'name': name, 'kind': 'class', 'doc': _doc(cls),
+            'bases': [b for b in bases if b is not None], 'members': members}
+
+
+def _class_member(name, raw, cls, module_name, depth):
+    if isinstance(raw, staticmethod):
+        return _function(name, 'staticmethod', raw.__func__)
+    if isinstance(raw, classmethod) \
+            or type(raw).__name__ == 'classmethod_descriptor':
+        # The bound method has the signature without ``cls``.
+        return _function(name, 'classmethod', raw, getattr(cls, name))
+    if inspect.isclass(raw):
+        return _module_member(name, raw, module_name, depth + 1)
+    if inspect.isdatadescriptor(raw):
+        return {'name': name, 'kind': 'property', 'doc': _doc(raw)}
+    if inspect.isroutine(raw) or inspect.ismethoddescriptor(raw):
+        return _function(name, 'method', raw)
+    return _value(name, raw)
+
+
+def _module_member(name, obj, module_name, depth=0):
+    if inspect.ismodule(obj):
+        return {'name': name, 'kind': 'module', 'module': obj.__name__}
+    if inspect.isclass(obj) or inspect.isroutine(obj):
+        ref = _reference(obj)
+        if ref is not None and ref[0] not in (None, module_name) \
+                and _is_importable(ref, obj):
+            return {'name': name, 'kind': 'alias', 'ref': ref}
+        if inspect.isclass(obj):
+            return _class(name, obj, module_name, depth)
+        return _function(name, 'function', obj)
+    return _value(name, obj)
+
+
+def describe(module):
+    members = []
+    for name in dir(module):
+        if name in _SKIP_MODULE:
+            continue
+        try:
+            members.append(_module_member(name, getattr(module, name),
+                                          module.__name__))
+        except Exception:
+            pass  # The attribute isn't really there or it's broken.
+    return {'name': module.__name__, 'doc': _doc(module), 'members': members}
+
+
+def _import(name, path):
+    if name is not None:
+        __import__(name)
+        return sys.modules[name]
+    name = os.path.basename(path).split('.')[0]
+    try:
+        from importlib.machinery import ExtensionFileLoader
+    except ImportError:
+        import imp
+        return imp.load_dynamic(name, path)
+    return ExtensionFileLoader(name, path).load_module()
+
+
+def main():
+    request = json.loads(sys.stdin.read())
+    # Modules print while they are imported, keep stdout for the result.
+    out = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    sys.path[:] = request['sys_path']
+    try:
+        module = _import(request['name'], request['path'])
+    except Exception as e:
+        result = {'error': '%s: %s' % (type(e).__name__, e)}
+    else:
+        result = describe(module)
+    out.write(json.dumps(result))
+    out.close()
+
+
+if __name__ == '__main__':
+    main()
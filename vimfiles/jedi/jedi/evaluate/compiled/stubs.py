@@ -0,0 +1,367 @@
+"""
+Compiled modules (C extensions) cannot be parsed. Instead of importing them
+into the |jedi| process, they are imported once in a throwaway process, which
+describes them (see :mod:`jedi.evaluate.compiled.introspect`). The
+description is rendered as Python source, a stub with the classes, functions
+(with signatures and docstrings) and values of the module::
+
+    class Connection(object):
+        'SQLite database connection object.'
+        def deserialize(self, data, name='main'):
+            'Load a serialized database. ...'
+
+The stub is stored in the cache directory and used until the extension's
+modification time changes. It's loaded like a normal Python module, therefore
+function bodies are only parsed when they are needed and the parsed module
+is cached with the other modules.
+"""
+import hashlib
+import imp
+import json
+import keyword
+import os
+import re
+import subprocess
+import sys
+import textwrap
+
+from jedi._compatibility import builtins, is_py3, unicode, literal_eval
+from jedi import settings
+from jedi import cache
+from jedi import debug
+from jedi.parser import tree
+from jedi.evaluate.sys_path import get_sys_path
+from jedi.evaluate.compiled import _parse_function_doc
+from jedi.evaluate.compiled import fake
+
+version = 1
+"""
+Increment this number, if the stubs that are rendered change.
+"""
+
+timeout = 10
+"""
+Seconds the introspection of one module may take (Python 3 only).
+"""
+
+_EXTENSION_SUFFIXES = tuple(suffix for suffix, _, typ in imp.get_suffixes()
+                            if typ == imp.C_EXTENSION)
+_INTROSPECT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'introspect.py')
+_name_re = re.compile(r'^[A-Za-z_]\w*$')
+_stub_cache = {}  # Stubs of this process, if they are not written to disk.
+
+
+def is_extension(path):
+    """Whether ``path`` is a compiled module that can be stubbed."""
+    return path is not None and path.endswith(_EXTENSION_SUFFIXES)
+
+
+def is_current(parser):
+    """
+    Whether the cached ``parser`` of an extension was parsed from a stub of
+    the current version. The parser cache only checks the extension itself.
+    """
+    return settings.compiled_module_stubs \
+        and getattr(parser, 'stub_version', None) == version
+
+
+def get_stub_source(path, dotted_path, sys_path=None):
+    """
+    Returns the stub of the extension at ``path`` or None if it cannot be
+    imported.
+    """
+    if sys_path is None:
+        sys_path = get_sys_path()
+    mtime = os.path.getmtime(path)
+    header = '# ' + json.dumps({'version': version, 'path': path,
+                                'mtime': mtime}) + '\n'
+    stub_path = _stub_path(path, dotted_path)
+    source = _read_stub(stub_path, header)
+    if source is not None:
+        return source
+
+    description = _introspect(path, dotted_path, sys_path)
+    if description is None:
+        return None
+    source = header + render(description)
+    _write_stub(stub_path, source)
+    return source
+
+
+def _stub_path(path, dotted_path):
+    name = dotted_path or os.path.basename(path).split('.')[0]
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    return os.path.join(settings.cache_directory, cache.ParserPickling.py_tag,
+                        'stubs', '%s-%s.py' % (name, digest))
+
+
+def _read_stub(stub_path, header):
+    if not settings.use_filesystem_cache:
+        source = _stub_cache.get(stub_path)
+    else:
+        try:
+            with open(stub_path, 'rb') as f:
+                source = f.read().decode('utf-8')
+        except IOError:
+            return None
+    if source is not None and source.startswith(header):
+        return source
+    return None
+
+
+def _write_stub(stub_path, source):
+    if not settings.use_filesystem_cache:
+        _stub_cache[stub_path] = source
+        return
+    directory = os.path.dirname(stub_path)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    # Other processes and threads might write the same stub at the same time.
+    tmp = '%s.%s.tmp' % (stub_path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(source.encode('utf-8'))
+    try:
+        cache._replace(tmp, stub_path)
+    except OSError:
+        os.remove(tmp)
+
+
+def _introspect(path, dotted_path, sys_path):
+    request = json.dumps({'name': dotted_path, 'path': path,
+                          'sys_path': sys_path}).encode('utf-8')
+    try:
+        process = subprocess.Popen([sys.executable, _INTROSPECT],
+                                   stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        if is_py3:
+            try:
+                out, err = process.communicate(request, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                debug.warning('Introspecting %s took too long.', path)
+                return None
+        else:
+            out, err = process.communicate(request)
+    except OSError as e:
+        debug.warning('Could not introspect %s: %s', path, e)
+        return None
+
+    try:
+        description = json.loads(out.decode('utf-8'))
+    except ValueError:
+        # The process crashed, which is not going to change.
+        debug.warning('Introspecting %s failed: %s', path, err[-500:])
+        return None
+    if 'error' in description:
+        debug.warning('Module %s not importable: %s', path,
+                      description['error'])
+        return None
+    return description
+
+
+def _is_name(name):
+    return bool(_name_re.match(name)) and not keyword.iskeyword(name) \
+        and name not in ('None', 'True', 'False')
+
+
+def render(description):
+    """Returns the Python source of the stub of a module description."""
+    renderer = _Renderer(description['name'])
+    faked = fake.parse_faked_module(description['name'])
+    body = renderer.members(description['members'], '', faked)
+    lines = []
+    if description['doc']:
+        lines.append(_docstring(description['doc'], ''))
+    lines += ['import %s' % m for m in sorted(renderer.imports)]
+    return '\n'.join(lines + body) + '\n'
+
+
+def _docstring(doc, indent):
+    return indent + repr(unicode(doc))
+
+
+class _Renderer(object):
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.imports = set()
+        self._classes = set()  # The top level classes of the module.
+
+    def members(self, members, indent, faked=None):
+        """
+        ``faked`` is the scope of :mod:`jedi.evaluate.compiled.fake` with the
+        same name, its functions replace the introspected ones.
+        """
+        members = [m for m in members if _is_name(m['name'])]
+        if not indent:
+            self._classes = set(m['name'] for m in members
+                                if m['kind'] == 'class')
+            members = self._ordered(members)
+
+        lines = []
+        for member in members:
+            kind = member['kind']
+            faked_scope = faked and fake.search_scope(faked, member['name'])
+            if kind == 'class':
+                if not isinstance(faked_scope, tree.Class):
+                    faked_scope = None
+                lines += self._class(member, indent, faked_scope)
+            elif kind in ('function', 'method') \
+                    and isinstance(faked_scope, tree.Function):
+                lines += self._faked_function(member, indent, faked_scope)
+            elif kind in ('function', 'method', 'classmethod', 'staticmethod',
+                          'property'):
+                lines += self._function(member, indent)
+            elif kind == 'module':
+                lines.append(self._module(member, indent))
+            else:
+                lines.append('%s%s = %s' % (indent, member['name'],
+                                            self._expression(member)))
+        return lines
+
+    def _ordered(self, members):
+        """Classes are defined after the classes they inherit from."""
+        by_name = dict((m['name'], m) for m in members if m['kind'] == 'class')
+        done = set()
+        result = []
+
+        def add(member):
+            if member['name'] in done:
+                return
+            done.add(member['name'])
+            if member['kind'] == 'class':
+                for module, name in member['bases']:
+                    if module == self.module_name and name in by_name:
+                        add(by_name[name])
+            result.append(member)
+
+        for member in members:
+            add(member)
+        return result
+
+    def _class(self, member, indent, faked):
+        bases = [self._reference(b) for b in member['bases']]
+        bases = [b for b in bases if b is not None] or ['object']
+        lines = ['%sclass %s(%s):' % (indent, member['name'], ', '.join(bases))]
+        body = self.members(member['members'], indent + '    ', faked)
+        if member['doc']:
+            body.insert(0, _docstring(member['doc'], indent + '    '))
+        return lines + (body or [indent + '    pass'])
+
+    def _function(self, member, indent):
+        kind = member['kind']
+        if kind == 'property':
+            lines = [indent + '@property']
+            params = ['self']
+        else:
+            lines = [indent + '@' + kind] if kind.endswith('method') \
+                and kind != 'method' else []
+            params = self._params(member, kind)
+        lines.append('%sdef %s(%s):' % (indent, member['name'], ', '.join(params)))
+
+        body = []
+        if member['doc']:
+            body.append(_docstring(member['doc'], indent + '    '))
+            ret = self._return(member['doc'])
+            if ret is not None:
+                body.append('%s    return %s' % (indent, ret))
+        return lines + (body or [indent + '    pass'])
+
+    def _faked_function(self, member, indent, faked):
+        colon = faked.children.index(':')
+        header = ''.join(c.get_code() for c in faked.children[:colon + 1])
+        body = textwrap.dedent(faked.children[colon + 1].get_code().strip('\n'))
+        lines = [indent + header.strip()]
+        if member['doc']:
+            lines.append(_docstring(member['doc'], indent + '    '))
+        return lines + [indent + '    ' + line for line in body.splitlines()]
+
+    def _params(self, member, kind):
+        params = member['params']
+        if params is None:
+            params = _params_from_doc(member['doc'] or '')
+            if kind == 'method':
+                params.insert(0, ['self', '', None])
+            elif kind == 'classmethod':
+                params.insert(0, ['cls', '', None])
+        elif kind == 'classmethod':
+            params.insert(0, ['cls', '', None])
+
+        # Make it valid Python 2 and 3 syntax, positional only and keyword
+        # only parameters don't exist there.
+        result = []
+        names = set()
+        needs_default = False
+        stars = ''
+        for name, param_stars, default in params:
+            if not _is_name(name) or name in names:
+                continue
+            if param_stars:
+                if param_stars <= stars:
+                    continue
+                stars = param_stars
+                result.append(param_stars + name)
+            elif stars == '**':
+                break
+            else:
+                needs_default |= default is not None or bool(stars)
+                if needs_default:
+                    result.append('%s=%s' % (name, default or 'None'))
+                else:
+                    result.append(name)
+            names.add(name)
+        # ``*args`` has to come after all the other parameters in Python 2.
+        result.sort(key=lambda p: p.startswith('**') * 2 + p.startswith('*'))
+        return result
+
+    def _return(self, doc):
+        ret = _parse_function_doc(doc)[1]
+        if ret in self._classes or ret != 'None' and _is_name(ret) \
+                and isinstance(getattr(builtins, ret, None), type):
+            return ret + '()'
+        return None
+
+    def _module(self, member, indent):
+        module = member['module']
+        if module == member['name']:
+            return '%simport %s' % (indent, module)
+        return '%simport %s as %s' % (indent, module, member['name'])
+
+    def _expression(self, member):
+        if member['kind'] == 'alias':
+            return self._reference(member['ref']) or 'None'
+        if 'literal' in member:
+            return member['literal']
+        typ = member['type'] and self._reference(member['type'])
+        return 'object()' if typ is None else typ + '()'
+
+    def _reference(self, ref):
+        if ref is None:
+            return None
+        module, name = ref
+        if module in ('builtins', '__builtin__'):
+            return name if hasattr(builtins, name) else None
+        if module == self.module_name:
+            return name if name in self._classes else None
+        if module and all(_is_name(n) for n in module.split('.')) \
+                and all(_is_name(n) for n in name.split('.')):
+            self.imports.add(module)
+            return module + '.' + name
+        return None
+
+
+def _params_from_doc(doc):
+    params = []
+    for param in _parse_function_doc(doc)[0].split(','):
+        name, _, default = param.strip().partition('=')
+        stars = len(name) - len(name.lstrip('*'))
+        default = default.strip()
+        try:
+            literal = default and repr(literal_eval(default))
+        except (ValueError, SyntaxError):
+            literal = 'None'
+        params.append([name.lstrip('*').strip(), '*' * stars,
+                       literal if default else None])
+    return params
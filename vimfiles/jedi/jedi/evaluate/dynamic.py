@@ -20,7 +20,6 @@ from itertools import chain
 
 from jedi._compatibility import unicode
 from jedi.parser import tree
-from jedi import settings
 from jedi import debug
 from jedi.evaluate.cache import memoize_default
 from jedi.evaluate import imports
@@ -51,7 +50,7 @@ def search_params(evaluator, param):
     have to look for all calls to ``func`` to find out what ``foo`` possibly
     is.
     """
-    if not settings.dynamic_params:
+    if not evaluator.settings.dynamic_params:
         return []
 
     func = param.get_parent_until(tree.Function)
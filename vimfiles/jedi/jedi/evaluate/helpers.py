@@ -39,6 +39,9 @@ def deep_ast_copy(obj, parent=None, new_elements=None):
                 new_child.parent = new_obj
             new_children.append(new_child)
         new_obj.children = new_children
+        if isinstance(new_obj, tree.Scope):
+            # The searches of the original point to the original children.
+            new_obj.clear_scope_index()
 
         # Copy the names_dict (if there is one).
         try:
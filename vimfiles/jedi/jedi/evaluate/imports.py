@@ -28,7 +28,9 @@ from jedi.evaluate import helpers
 from jedi import settings
 from jedi.common import source_to_unicode
 from jedi.evaluate import compiled
+from jedi.evaluate.compiled import stubs
 from jedi.evaluate import analysis
+from jedi.evaluate import prefetch
 from jedi.evaluate.cache import memoize_default, NO_DEFAULT
 
 
@@ -321,12 +323,13 @@ class Importer(object):
                 debug.dbg('search_module %s in %s', import_parts[-1], self.file_path)
                 # Override the sys.path. It works only good that way.
                 # Injecting the path directly into `find_module` did not work.
-                sys.path, temp = sys_path, sys.path
-                try:
-                    module_file, module_path, is_pkg = \
-                        find_module(import_parts[-1])
-                finally:
-                    sys.path = temp
+                with common.sys_path_lock:
+                    sys.path, temp = sys_path, sys.path
+                    try:
+                        module_file, module_path, is_pkg = \
+                            find_module(import_parts[-1])
+                    finally:
+                        sys.path = temp
             except ImportError:
                 # The module is not a package.
                 _add_error(self._evaluator, import_path[-1])
@@ -434,20 +437,39 @@ class Importer(object):
 def _load_module(evaluator, path=None, source=None, sys_path=None):
     def load(source):
         dotted_path = path and compiled.dotted_from_fs_path(path, sys_path)
-        if path is not None and path.endswith('.py') \
-                and not dotted_path in settings.auto_import_modules:
+        auto_import = dotted_path in evaluator.settings.auto_import_modules
+        file_source = None  # The bytes of `path`, they are hashed.
+        is_stub = False
+        if path is not None and path.endswith('.py') and not auto_import:
             if source is None:
                 with open(path, 'rb') as f:
                     source = f.read()
+            file_source = source
+        elif settings.compiled_module_stubs and stubs.is_extension(path) \
+                and not auto_import:
+            source = stubs.get_stub_source(path, dotted_path, sys_path)
+            if source is None:
+                return None
+            is_stub = True
         else:
             return compiled.load_module(path)
         p = path
-        p = fast.FastParser(evaluator.grammar, common.source_to_unicode(source), p)
-        cache.save_parser(path, p)
+        p = fast.FastParser(evaluator.grammar, common.source_to_unicode(source), p,
+                            skeleton=settings.skeleton_parsing)
+        if is_stub:
+            p.stub_version = stubs.version
+        cache.save_parser(path, p, source=file_source)
         return p.module
 
     cached = cache.load_parser(path)
+    if cached is not None and stubs.is_extension(path) \
+            and not stubs.is_current(cached):
+        cached = None
+    if cached is None:
+        cached = prefetch.load_prefetched(path)
     module = load(source) if cached is None else cached.module
+    if isinstance(module, tree.Module):
+        prefetch.prefetch_imports(module)
     module = evaluator.wrap(module)
     return module
 
@@ -476,8 +498,8 @@ def get_modules_containing_name(evaluator, mods, name):
 
     def check_fs(path):
         with open(path, 'rb') as f:
-            source = source_to_unicode(f.read())
-            if name in source:
+            source = f.read()
+            if name in source_to_unicode(source):
                 module_name = os.path.basename(path)[:-3]  # Remove `.py`.
                 module = _load_module(evaluator, path, source)
                 add_module(evaluator, module_name, module)
@@ -490,8 +512,8 @@ def get_modules_containing_name(evaluator, mods, name):
         mod_paths.add(m.path)
         yield m
 
-    if settings.dynamic_params_for_other_modules:
-        paths = set(settings.additional_dynamic_modules)
+    if evaluator.settings.dynamic_params_for_other_modules:
+        paths = set(evaluator.settings.additional_dynamic_modules)
         for p in mod_paths:
             if p is not None:
                 d = os.path.dirname(p)
@@ -0,0 +1,168 @@
+"""
+Parsing the modules that a module imports is on the critical path of the
+evaluation. If ``settings.prefetch_imports`` is on, the modules that a freshly
+loaded module imports are parsed in a process pool right away, while the
+evaluation continues. :func:`load_prefetched` then hands the trees to
+``cache.parser_cache`` when the import is actually followed.
+
+The imports are found with a cheap search in the directory of the module and
+the ``sys.path``. A module that isn't found just isn't prefetched.
+"""
+import os
+import sys
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    # Python 2 without the ``futures`` backport.
+    ProcessPoolExecutor = None
+
+from jedi._compatibility import unicode
+from jedi import settings
+from jedi import common
+from jedi import cache
+from jedi import debug
+from jedi.parser import load_grammar
+from jedi.parser import fast
+from jedi.evaluate.sys_path import get_sys_path
+
+_executor = None
+_futures = {}  # path -> Future
+
+
+def prefetch_imports(module):
+    """
+    Starts parsing the modules that ``module`` imports.
+    """
+    if not settings.prefetch_imports or ProcessPoolExecutor is None \
+            or module.path is None:
+        return
+
+    _store_done()
+    for path in _import_paths(module):
+        if path in _futures or path in cache.parser_cache:
+            continue
+        try:
+            change_time = os.path.getmtime(path)
+        except OSError:
+            continue
+        if settings.use_filesystem_cache \
+                and cache.ParserPickling.is_up_to_date(path, change_time):
+            continue
+        debug.dbg('prefetch %s', path)
+        _futures[path] = _get_executor().submit(parse_module, path)
+
+
+def load_prefetched(path):
+    """
+    Returns the prefetched parser for ``path`` or None. Waits if the module is
+    still being parsed.
+    """
+    try:
+        future = _futures.pop(path)
+    except KeyError:
+        return None
+    if future.cancel():
+        # Still waiting for a worker, parsing it now is faster.
+        return None
+    try:
+        result = future.result()[1]
+    except Exception as e:  # e.g. a BrokenProcessPool
+        debug.warning('prefetching %s failed: %s', path, e)
+        return None
+    if result is None:
+        return None
+
+    parser_cache_item = pickle.loads(result[2])
+    cache.parser_cache[path] = parser_cache_item
+    if settings.use_filesystem_cache:
+        cache.ParserPickling.save_pickled(path, *result)
+    return parser_cache_item.parser
+
+
+def _store_done():
+    """
+    Moves finished modules that nobody asked for yet to the file system
+    cache, where they don't use any memory.
+    """
+    if not settings.use_filesystem_cache:
+        return
+    for path, future in list(_futures.items()):
+        if future.done():
+            del _futures[path]
+            try:
+                result = future.result()[1]
+            except Exception:
+                continue
+            if result is not None:
+                cache.ParserPickling.save_pickled(path, *result)
+
+
+def parse_module(path):
+    """
+    Returns ``(path, (change_time, source_hash, pickled ParserCacheItem))``,
+    or ``(path, None)`` if the module cannot be parsed. Runs in the worker
+    processes.
+    """
+    try:
+        change_time = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            source = f.read()
+        grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+        parser = fast.FastParser(grammar, common.source_to_unicode(source),
+                                 path, skeleton=settings.skeleton_parsing)
+        source_hash = cache.hash_source(source)
+        item = cache.ParserCacheItem(parser, change_time, source_hash)
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        debug.warning('Could not parse %s: %s', path, e)
+        return path, None
+    return path, (change_time, source_hash, data)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor()
+    return _executor
+
+
+def _import_paths(module):
+    module_dir = os.path.dirname(module.path)
+    for imp in module.imports:
+        if imp.level:
+            # Relative imports.
+            directory = module_dir
+            for _ in range(imp.level - 1):
+                directory = os.path.dirname(directory)
+            directories = [directory]
+        else:
+            directories = [module_dir] + get_sys_path()
+
+        for import_path in imp.paths():
+            for path in _find_modules([unicode(n) for n in import_path],
+                                      directories):
+                yield path
+
+
+def _find_modules(names, directories):
+    """
+    Yields the files of the source modules and packages in the dotted path
+    ``names``, e.g. ``os/__init__.py`` and ``os/path.py``.
+    """
+    for name in names:
+        for directory in directories:
+            package = os.path.join(directory, name)
+            init = os.path.join(package, '__init__.py')
+            if os.path.isfile(init):
+                yield init
+                directories = [package]
+                break
+            if os.path.isfile(package + '.py'):
+                yield package + '.py'
+                return
+        else:
+            return
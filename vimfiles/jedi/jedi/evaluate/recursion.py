@@ -3,12 +3,11 @@ Recursions are the recipe of |jedi| to conquer Python code. However, someone
 must stop recursions going mad. Some settings are here to make |jedi| stop at
 the right time. You can read more about them :ref:`here <settings-recursion>`.
 
-Next to :mod:`jedi.evaluate.cache` this module also makes |jedi| not
-thread-safe. Why?  ``execution_recursion_decorator`` uses class variables to
-count the function calls.
+The detectors belong to an evaluator and read the limits from its request
+settings, see :class:`jedi.common.RequestSettings`. An evaluator must
+therefore only be used by one thread at a time.
 """
 from jedi import debug
-from jedi import settings
 from jedi.evaluate import compiled
 from jedi.evaluate import iterable
 
@@ -19,10 +18,12 @@ def recursion_decorator(func):
         # print stmt, len(self.node_statements())
         if rec_detect.push_stmt(stmt):
             return []
-        else:
-            result = func(evaluator, stmt, *args, **kwargs)
+        try:
+            return func(evaluator, stmt, *args, **kwargs)
+        finally:
+            # Also if the evaluation was cancelled, otherwise the statement
+            # would stay active.
             rec_detect.pop_stmt()
-        return result
     return run
 
 
@@ -34,31 +35,32 @@ class RecursionDetector(object):
     def __init__(self):
         self.top = None
         self.current = None
+        # The active nodes by their `_RecursionNode.key`. Looking a statement
+        # up here doesn't depend on the depth.
+        self._active = {}
 
     def push_stmt(self, stmt):
-        self.current = _RecursionNode(stmt, self.current)
-        check = self._check_recursion()
-        if check:
-            debug.warning('catched stmt recursion: %s against %s @%s', stmt,
-                          check.stmt, stmt.start_pos)
-            self.pop_stmt()
-            return True
-        return False
+        self.current = node = _RecursionNode(stmt, self.current)
+        if node.is_ignored:
+            return False
+        try:
+            check = self._active[node.key]
+        except KeyError:
+            self._active[node.key] = node
+            return False
+        debug.warning('catched stmt recursion: %s against %s @%s', stmt,
+                      check.stmt, stmt.start_pos)
+        self.current = node.parent
+        return True
 
     def pop_stmt(self):
         if self.current is not None:
             # I don't know how current can be None, but sometimes it happens
             # with Python3.
-            self.current = self.current.parent
-
-    def _check_recursion(self):
-        test = self.current
-        while True:
-            test = test.parent
-            if self.current == test:
-                return test
-            if not test:
-                return False
+            node = self.current
+            if not node.is_ignored:
+                del self._active[node.key]
+            self.current = node.parent
 
     def node_statements(self):
         result = []
@@ -82,24 +84,23 @@ class _RecursionNode(object):
         # simple.
         self.is_ignored = self.script == compiled.builtin
 
-    def __eq__(self, other):
-        if not other:
-            return None
-
-        return self.script == other.script \
-            and self.position == other.position \
-            and not self.is_ignored and not other.is_ignored
+    @property
+    def key(self):
+        """Nodes with the same key are a recursion."""
+        return self.script, self.position
 
 
 def execution_recursion_decorator(func):
     def run(execution, **kwargs):
-        detector = execution._evaluator.execution_recursion_detector
-        if detector.push_execution(execution):
-            result = []
-        else:
-            result = func(execution, **kwargs)
-        detector.pop_execution()
-        return result
+        evaluator = execution._evaluator
+        evaluator.check_cancelled()
+        detector = evaluator.execution_recursion_detector
+        try:
+            if detector.push_execution(execution) or evaluator.deadline_exceeded():
+                return []
+            return func(execution, **kwargs)
+        finally:
+            detector.pop_execution()
 
     return run
 
@@ -112,6 +113,8 @@ class ExecutionRecursionDetector(object):
     def __init__(self):
         self.recursion_level = 0
         self.parent_execution_funcs = []
+        # How often the functions are in `parent_execution_funcs`.
+        self._parent_counts = {}
         self.execution_funcs = set()
         self.execution_count = 0
 
@@ -126,16 +129,24 @@ class ExecutionRecursionDetector(object):
         return result
 
     def pop_execution(cls):
-        cls.parent_execution_funcs.pop()
+        func = cls.parent_execution_funcs.pop()
+        count = cls._parent_counts[func] - 1
+        if count:
+            cls._parent_counts[func] = count
+        else:
+            del cls._parent_counts[func]
         cls.recursion_level -= 1
 
     def push_execution(cls, execution):
-        in_par_execution_funcs = execution.base in cls.parent_execution_funcs
-        in_execution_funcs = execution.base in cls.execution_funcs
+        func = execution.base
+        in_par_execution_funcs = func in cls._parent_counts
+        in_execution_funcs = func in cls.execution_funcs
         cls.recursion_level += 1
         cls.execution_count += 1
-        cls.execution_funcs.add(execution.base)
-        cls.parent_execution_funcs.append(execution.base)
+        cls.execution_funcs.add(func)
+        cls.parent_execution_funcs.append(func)
+        cls._parent_counts[func] = cls._parent_counts.get(func, 0) + 1
+        settings = execution._evaluator.settings
 
         if cls.execution_count > settings.max_executions:
             return True
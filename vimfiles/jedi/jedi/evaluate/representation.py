@@ -587,10 +587,20 @@ class FunctionExecution(Executed):
 
     def __init__(self, evaluator, base, *args, **kwargs):
         super(FunctionExecution, self).__init__(evaluator, base, *args, **kwargs)
-        self._copy_dict = {}
-        new_func = helpers.deep_ast_copy(base.base_func, self, self._copy_dict)
-        self.children = new_func.children
-        self.names_dict = new_func.names_dict
+        func = base.base_func
+        if _is_independent(evaluator, func):
+            # The executions share the body and therefore also the memoized
+            # results of its nodes, they would be the same anyway.
+            self._copy_dict = None
+            self._flow_scope = func
+            self.children = func.children
+            self.names_dict = func.names_dict
+        else:
+            self._copy_dict = {}
+            self._flow_scope = self
+            new_func = helpers.deep_ast_copy(func, self, self._copy_dict)
+            self.children = new_func.children
+            self.names_dict = new_func.names_dict
 
     @memoize_default(default=())
     @recursion.execution_recursion_decorator
@@ -617,7 +627,7 @@ class FunctionExecution(Executed):
             types = list(docstrings.find_return_types(self._evaluator, func))
 
         for r in returns:
-            check = flow_analysis.break_check(self._evaluator, self, r)
+            check = flow_analysis.break_check(self._evaluator, self._flow_scope, r)
             if check is flow_analysis.UNREACHABLE:
                 debug.dbg('Return unreachable: %s', r)
             else:
@@ -697,6 +707,31 @@ class FunctionExecution(Executed):
         return "<%s of %s>" % (type(self).__name__, self.base)
 
 
+@memoize_default(False, evaluator_is_first_arg=True)
+def _is_independent(evaluator, func):
+    """
+    Whether the executions of ``func`` don't depend on the arguments, because
+    its body doesn't use any of the params. Such a body doesn't need to be
+    copied for an execution. Methods of instances are always copied, they are
+    evaluated in the context of the instance.
+    """
+    if not isinstance(func, tree.Function):
+        return False
+    params = set(p.name.value for p in func.params)
+    # The fast parser appends parts of the body after the suite, therefore all
+    # the children are checked.
+    nodes = [c for c in func.children
+             if not isinstance(c, tree.Param) and c.type != 'parameters']
+    while nodes:
+        node = nodes.pop()
+        if node.type == 'name':
+            if node.value in params:
+                return False
+        elif isinstance(node, tree.BaseNode):
+            nodes += node.children
+    return True
+
+
 class GlobalName(helpers.FakeName):
     def __init__(self, name):
         """
@@ -170,13 +170,14 @@ def _get_paths_from_buildout_script(evaluator, buildout_script):
     def load(buildout_script):
         try:
             with open(buildout_script, 'rb') as f:
-                source = common.source_to_unicode(f.read())
+                source = f.read()
         except IOError:
             debug.dbg('Error trying to read buildout_script: %s', buildout_script)
             return
 
-        p = Parser(evaluator.grammar, source, buildout_script)
-        cache.save_parser(buildout_script, p)
+        p = Parser(evaluator.grammar, common.source_to_unicode(source),
+                   buildout_script)
+        cache.save_parser(buildout_script, p, source=source)
         return p.module
 
     cached = cache.load_parser(buildout_script)
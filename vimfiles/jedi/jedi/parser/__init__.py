@@ -17,13 +17,19 @@ complexity of the ``Parser`` (there's another parser sitting inside
 """
 import os
 import re
+import hashlib
 
+from jedi._compatibility import intern_string
+from jedi import settings
+from jedi import cache
+from jedi import debug
 from jedi.parser import tree as pt
 from jedi.parser import tokenize
 from jedi.parser import token
 from jedi.parser.token import (DEDENT, INDENT, ENDMARKER, NEWLINE, NUMBER,
                                STRING, OP, ERRORTOKEN)
 from jedi.parser.pgen2.pgen import generate_grammar
+from jedi.parser.pgen2.grammar import Grammar
 from jedi.parser.pgen2.parse import PgenParser
 
 OPERATOR_KEYWORDS = 'and', 'for', 'if', 'else', 'in', 'is', 'lambda', 'not', 'or'
@@ -48,7 +54,41 @@ def load_grammar(file='grammar3.4'):
     try:
         return _loaded_grammars[path]
     except KeyError:
-        return _loaded_grammars.setdefault(path, generate_grammar(path))
+        return _loaded_grammars.setdefault(path, _load_grammar_tables(path))
+
+
+def _load_grammar_tables(path):
+    """
+    Generating the parser tables from a grammar file takes a while, so they
+    are dumped to the cache directory. The file name contains the hash of the
+    grammar file, changing the grammar generates new tables.
+    """
+    if not settings.use_filesystem_cache:
+        return generate_grammar(path)
+
+    with open(path, 'rb') as f:
+        digest = hashlib.md5(f.read()).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    tables_path = os.path.join(settings.cache_directory,
+                               cache.ParserPickling.py_tag,
+                               '%s-%s.pickle' % (name, digest))
+    grammar = Grammar()
+    try:
+        grammar.load(tables_path)
+        return grammar
+    except Exception:
+        pass  # Not generated yet or broken.
+
+    grammar = generate_grammar(path)
+    tmp_path = '%s.%s.tmp' % (tables_path, os.getpid())
+    try:
+        if not os.path.exists(os.path.dirname(tables_path)):
+            os.makedirs(os.path.dirname(tables_path))
+        grammar.dump(tmp_path)
+        cache._replace(tmp_path, tables_path)
+    except EnvironmentError as e:
+        debug.warning('Could not save the grammar tables: %s', e)
+    return grammar
 
 
 class ErrorStatement(object):
@@ -207,7 +247,11 @@ class Parser(object):
 
     def convert_leaf(self, grammar, type, value, prefix, start_pos):
         #print('leaf', value, pytree.type_repr(type))
+        if not prefix or prefix.isspace():
+            # Comments are rare, indentation is everywhere.
+            prefix = intern_string(prefix)
         if type == tokenize.NAME:
+            value = intern_string(value)
             if value in grammar.keywords:
                 if value in ('def', 'class', 'lambda'):
                     self._scope_names_stack.append({})
@@ -228,7 +272,8 @@ class Parser(object):
         elif type in (NEWLINE, ENDMARKER):
             return pt.Whitespace(self.position_modifier, value, start_pos, prefix)
         else:
-            return pt.Operator(self.position_modifier, value, start_pos, prefix)
+            return pt.Operator(self.position_modifier, intern_string(value),
+                               start_pos, prefix)
 
     def error_recovery(self, grammar, stack, typ, value, start_pos, prefix,
                        add_token_callback):
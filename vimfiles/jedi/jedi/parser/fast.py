@@ -3,19 +3,24 @@ Basically a parser that is faster, because it tries to parse only parts and if
 anything changes, it only reparses the changed parts. But because it's not
 finished (and still not working as I want), I won't document it any further.
 """
+import os
 import re
 from itertools import chain
 
 from jedi._compatibility import use_metaclass
 from jedi import settings
-from jedi.parser import Parser
+from jedi.parser import Parser, load_grammar, _loaded_grammars
 from jedi.parser import tree
 from jedi import cache
 from jedi import debug
-from jedi.parser.tokenize import (source_tokens, NEWLINE,
-                                  ENDMARKER, INDENT, DEDENT)
+from jedi.parser.tokenize import (source_tokens, NEWLINE, ENDMARKER, INDENT,
+                                  DEDENT, NAME, OP, ERRORTOKEN)
 
 FLOWS = 'if', 'else', 'elif', 'while', 'with', 'try', 'except', 'finally', 'for'
+# The state of `FastParser._split_lines` at the start of a file: indent_list
+# (-1, because that indent is always smaller than any other), new_indent,
+# parentheses_level, flow_indent and is_decorator.
+_INITIAL_SPLIT_STATE = (-1, 0), False, 0, None, False
 
 
 class FastModule(tree.Module):
@@ -25,20 +30,28 @@ class FastModule(tree.Module):
         super(FastModule, self).__init__([])
         self.modules = []
         self.reset_caches()
+        self._used_names = MergedNamesDict([])
+        self._used_names_key = None, 0
         self.names_dict = {}
         self.path = module_path
 
     def reset_caches(self):
         self.modules = []
-        try:
-            del self._used_names  # Remove the used names cache.
-        except AttributeError:
-            pass  # It was never used.
+        # The `LazySuite` objects of the modules.
+        self.lazy_suites = []
 
     @property
-    @cache.underscore_memoization
     def used_names(self):
-        return MergedNamesDict([m.used_names for m in self.modules])
+        # The index is kept between updates, ``update_dicts`` only touches the
+        # names of the modules that were reparsed.
+        modules = self.modules
+        cached_modules, length = self._used_names_key
+        if cached_modules is not modules or length != len(modules):
+            with cache.lock:
+                self._used_names.update_dicts([m.used_names for m in modules],
+                                              self.lazy_suites)
+                self._used_names_key = modules, len(modules)
+        return self._used_names
 
     @property
     def global_names(self):
@@ -68,27 +81,128 @@ class FastModule(tree.Module):
 
 
 class MergedNamesDict(object):
-    def __init__(self, dicts):
-        self.dicts = dicts
+    """
+    Looks like one names dict, but consists of the names dicts of multiple
+    parsers. The merged lists are built on first access and cached, so
+    repeated lookups are simple dict hits.
+
+    Function bodies in ``lazy_suites`` are parsed when one of their names is
+    looked up, parsing them adds names to the dicts.
+    """
+    def __init__(self, dicts, lazy_suites=()):
+        self.dicts = []
+        self._merged = {}
+        self._key_counts = {}
+        self._lazy_index = {}
+        # The indexed suites with their names as ``(suite, names)``, the
+        # names of a suite are gone after parsing it.
+        self._lazy_suites = []
+        self.update_dicts(dicts, lazy_suites)
+
+    @cache.synchronized
+    def _parse_lazy_suites(self, names):
+        for name in names:
+            # Another thread might have parsed them in the meantime.
+            for suite in self._lazy_index.pop(name, ()):
+                suite.parse_body()
+        self._count_names(names)
+
+    def _count_names(self, names):
+        for name in names:
+            self._merged.pop(name, None)
+            count = sum(name in dct for dct in self.dicts)
+            if count:
+                self._key_counts[name] = count
+            else:
+                self._key_counts.pop(name, None)
+
+    def _remove_lazy_suites(self, keep):
+        kept = []
+        for suite, names in self._lazy_suites:
+            if keep(suite):
+                kept.append((suite, names))
+                continue
+            for name in names:
+                suites = [s for s in self._lazy_index.get(name, ())
+                          if s is not suite]
+                if suites:
+                    self._lazy_index[name] = suites
+                else:
+                    self._lazy_index.pop(name, None)
+            if suite.is_parsed():
+                # Parsing added the names of the body to the dicts.
+                self._count_names(names)
+        self._lazy_suites = kept
+
+    def update_dicts(self, dicts, lazy_suites=()):
+        """
+        Replaces the merged dicts and the suites that are parsed on lookup.
+        Only the names of dicts that were added or removed are merged again,
+        the dicts are compared by identity.
+        """
+        # The counts of the old dicts have to be right, before they are
+        # removed.
+        self._remove_lazy_suites(lambda suite: not suite.is_parsed())
+        new_ids = set(id(dct) for dct in dicts)
+        old_ids = set(id(dct) for dct in self.dicts)
+        kept_old = [id(dct) for dct in self.dicts if id(dct) in new_ids]
+        kept_new = [id(dct) for dct in dicts if id(dct) in old_ids]
+        if kept_old != kept_new:
+            # The order changed, start from scratch.
+            self.dicts = []
+            self._merged = {}
+            self._key_counts = {}
+            old_ids = set()
+
+        counts = self._key_counts
+        merged = self._merged
+        for dct in self.dicts:
+            if id(dct) not in new_ids:
+                for key in dct:
+                    merged.pop(key, None)
+                    counts[key] -= 1
+                    if not counts[key]:
+                        del counts[key]
+        for dct in dicts:
+            if id(dct) not in old_ids:
+                for key in dct:
+                    merged.pop(key, None)
+                    counts[key] = counts.get(key, 0) + 1
+        self.dicts = list(dicts)
+
+        # Only the suites that were added or removed are indexed again.
+        new_ids = set(id(suite) for suite in lazy_suites)
+        self._remove_lazy_suites(lambda suite: id(suite) in new_ids)
+        old_ids = set(id(suite) for suite, names in self._lazy_suites)
+        for suite in lazy_suites:
+            if id(suite) not in old_ids and not suite.is_parsed():
+                self._lazy_suites.append((suite, suite.names))
+                for name in suite.names:
+                    self._lazy_index.setdefault(name, []).append(suite)
 
     def __iter__(self):
-        return iter(set(key for dct in self.dicts for key in dct))
+        self._parse_lazy_suites(list(self._lazy_index))
+        return iter(self._key_counts)
 
     def __getitem__(self, value):
-        return list(chain.from_iterable(dct.get(value, []) for dct in self.dicts))
+        try:
+            return self._merged[value]
+        except KeyError:
+            if value in self._lazy_index:
+                self._parse_lazy_suites([value])
+            with cache.lock:
+                if value not in self._key_counts:
+                    return []
+                names = list(chain.from_iterable(dct.get(value, [])
+                                                 for dct in self.dicts))
+                self._merged[value] = names
+            return names
 
     def items(self):
-        dct = {}
-        for d in self.dicts:
-            for key, values in d.items():
-                try:
-                    dct_values = dct[key]
-                    dct_values += values
-                except KeyError:
-                    dct[key] = list(values)
-        return dct.items()
+        return [(key, self[key]) for key in self]
 
     def values(self):
+        self._parse_lazy_suites(list(self._lazy_index))
         lst = []
         for dct in self.dicts:
             lst += dct.values()
@@ -97,16 +211,20 @@ class MergedNamesDict(object):
 
 class CachedFastParser(type):
     """ This is a metaclass for caching `FastParser`. """
-    def __call__(self, grammar, source, module_path=None):
+    def __call__(self, grammar, source, module_path=None, skeleton=False):
         if not settings.fast_parser:
             return Parser(grammar, source, module_path)
 
-        pi = cache.parser_cache.get(module_path, None)
-        if pi is None or isinstance(pi.parser, Parser):
-            p = super(CachedFastParser, self).__call__(grammar, source, module_path)
-        else:
-            p = pi.parser  # pi is a `cache.ParserCacheItem`
-            p.update(source)
+        with cache.lock:
+            # Updating changes the cached module in place.
+            pi = cache.parser_cache.get(module_path, None)
+            if pi is None or isinstance(pi.parser, Parser) \
+                    or pi.parser.skeleton != skeleton:
+                p = super(CachedFastParser, self).__call__(grammar, source,
+                                                           module_path, skeleton)
+            else:
+                p = pi.parser  # pi is a `cache.ParserCacheItem`
+                p.update(source)
         return p
 
 
@@ -115,10 +233,11 @@ class ParserNode(object):
         self._fast_module = fast_module
         self.parent = None
         self._node_children = []
+        self._merged_names = None
 
         self.source = source
-        self.hash = hash(source)
         self.parser = parser
+        self.lazy_suites = getattr(parser, 'lazy_suites', [])
 
         try:
             # With fast_parser we have either 1 subscope or only statements.
@@ -143,7 +262,10 @@ class ParserNode(object):
         if tree.is_node(c[-1], 'suite'):  # In a simple_stmt there's no DEDENT.
             end_marker = self.parser.module.children[-1]
             # Set the DEDENT prefix instead of the ENDMARKER.
-            c[-1].children[-1].prefix = end_marker.prefix
+            if isinstance(c[-1], LazySuite) and not c[-1].is_parsed():
+                c[-1].dedent_prefix = end_marker.prefix
+            else:
+                c[-1].children[-1].prefix = end_marker.prefix
             end_marker.prefix = ''
 
     def __repr__(self):
@@ -161,6 +283,7 @@ class ParserNode(object):
         self._node_children = []
         scope = self._content_scope
         scope.children = list(self._old_children)
+        scope.clear_scope_index()
         try:
             # This works if it's a MergedNamesDict.
             # We are correcting it, because the MergedNamesDicts are artificial
@@ -178,8 +301,17 @@ class ParserNode(object):
         if self._node_children:
             dcts = [n.parser.module.names_dict for n in self._node_children]
             # Need to insert the own node as well.
-            dcts.insert(0, self._content_scope.names_dict)
-            self._content_scope.names_dict = MergedNamesDict(dcts)
+            names_dict = self._content_scope.names_dict
+            if names_dict is self._merged_names:
+                names_dict = names_dict.dicts[0]
+            dcts.insert(0, names_dict)
+            # Reuse the index of the last parse, most of the dicts are the
+            # same.
+            if self._merged_names is None:
+                self._merged_names = MergedNamesDict(dcts)
+            else:
+                self._merged_names.update_dicts(dcts)
+            self._content_scope.names_dict = self._merged_names
 
     def parent_until_indent(self, indent=None):
         if (indent is None or self._indent >= indent) and self.parent is not None:
@@ -201,6 +333,7 @@ class ParserNode(object):
         m = node.parser.module
         node.parser.position_modifier.line = line_offset
         self._fast_module.modules.append(m)
+        self._fast_module.lazy_suites += node.lazy_suites
         node.parent = self
 
         self._node_children.append(node)
@@ -211,6 +344,7 @@ class ParserNode(object):
         for child in m.children:
             child.parent = scope
             scope.children.append(child)
+        scope.clear_scope_index()
 
         return node
 
@@ -228,6 +362,323 @@ class ParserNode(object):
         self.parser.remove_last_newline()
 
 
+class LazySuite(tree.Node):
+    """
+    The suite of a function, whose body is only parsed when its children are
+    accessed. Until then it's just the source code of the function.
+
+    Parsing adds the names of the body to the ``used_names`` of the parser and
+    to the ``names_dict`` of the function, which parses the body as well when
+    it's accessed.
+    """
+    __slots__ = ('_children', 'source', 'names', 'dedent_prefix', '_lazy')
+
+    def __init__(self, source, names, line_offset, start_pos, dedent,
+                 parser):
+        self.type = 'suite'
+        self.parent = None
+        self._children = None
+        self.source = source
+        # The names in the body, to know which bodies to parse for a name.
+        self.names = names
+        dedent_pos, self.dedent_prefix = dedent
+        self._lazy = (line_offset, start_pos, dedent_pos, parser.grammar_name,
+                      parser.position_modifier, parser._used_names, None)
+
+    @property
+    def children(self):
+        if self._children is None:
+            self.parse_body()
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self.source = self.names = self._lazy = None
+
+    def is_parsed(self):
+        return self._children is not None
+
+    @property
+    def start_pos(self):
+        if self._children is None:
+            line, column = self._lazy[1]
+            return line + self._lazy[4].line, column
+        return self._children[0].start_pos
+
+    @property
+    def end_pos(self):
+        if self._children is None:
+            line, column = self._lazy[2]
+            return line + self._lazy[4].line, column
+        return self._children[-1].end_pos
+
+    def set_names_dict(self, names_dict):
+        """
+        Returns the ``names_dict`` of the function, which parses the body on
+        access.
+        """
+        names_dict = _LazyNamesDict(names_dict, self)
+        self._lazy = self._lazy[:-1] + (names_dict,)
+        return names_dict
+
+    def parse_body(self):
+        if self._children is None:
+            with cache.lock:
+                # Another thread might have parsed it in the meantime.
+                if self._children is None:
+                    self._parse_body()
+
+    def _parse_body(self):
+        line_offset, start_pos, dedent_pos, grammar_name, position_modifier, \
+            used_names, names_dict = self._lazy
+        p = Parser(load_grammar(grammar_name), self.source)
+        try:
+            function = p.module.subscopes[0]
+        except IndexError:
+            function = None
+        if function is None or not tree.is_node(function.children[-1], 'suite'):
+            # Error recovery removed the function, this is invalid code.
+            suite_names = {}
+            children = [tree.Whitespace(position_modifier, '', start_pos, ''),
+                        tree.Operator(position_modifier, '', dedent_pos, '')]
+        else:
+            suite_names = function.names_dict
+            children = function.children[-1].children
+
+        # Only the names that end up in the tree are used, error recovery
+        # may have left others in the dicts.
+        names = set()
+        for child in children:
+            child.parent = self
+            for leaf in _leaves(child):
+                leaf.position_modifier = position_modifier
+                leaf._start_pos = leaf._start_pos[0] + line_offset, leaf._start_pos[1]
+                if leaf.type == 'name':
+                    names.add(id(leaf))
+        dedent = children[-1]
+        if isinstance(dedent, tree.Operator) and not dedent.value:
+            dedent._start_pos = dedent_pos
+            dedent.prefix = self.dedent_prefix
+        self.children = children
+
+        for key, lst in p.module.used_names.items():
+            lst = [n for n in lst if id(n) in names]
+            used = used_names.setdefault(key, [])
+            if lst:
+                used[:] = sorted(used + lst, key=lambda n: n._start_pos)
+        if names_dict is not None:
+            names_dict.suite = None
+            for key, lst in suite_names.items():
+                lst = [n for n in lst if id(n) in names]
+                dict.setdefault(names_dict, key, []).extend(lst)
+
+    def __getstate__(self):
+        # Don't parse the body just to pickle it.
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name != 'children' and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return None, state
+
+
+def _leaves(node):
+    try:
+        children = node.children
+    except AttributeError:
+        yield node
+    else:
+        for child in children:
+            for leaf in _leaves(child):
+                yield leaf
+
+
+class _LazyNamesDict(dict):
+    """
+    The ``names_dict`` of a function with a `LazySuite`. Its body is parsed,
+    before the names are looked at.
+    """
+    def __init__(self, names_dict, suite):
+        super(_LazyNamesDict, self).__init__(names_dict)
+        self.suite = suite
+
+    def _parse(self):
+        if self.suite is not None:
+            self.suite.parse_body()
+
+    def __getitem__(self, key):
+        self._parse()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._parse()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._parse()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._parse()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._parse()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._parse()
+        return dict.keys(self)
+
+    def values(self):
+        self._parse()
+        return dict.values(self)
+
+    def items(self):
+        self._parse()
+        return dict.items(self)
+
+    def __reduce__(self):
+        return _LazyNamesDict, (dict(dict.items(self)), self.suite)
+
+
+def _grammar_name(grammar):
+    for path, loaded in _loaded_grammars.items():
+        if loaded is grammar:
+            return os.path.splitext(os.path.basename(path))[0]
+    raise ValueError('Grammars of skeleton parsers are loaded by name.')
+
+
+class SkeletonParser(Parser):
+    """
+    A `Parser` that doesn't parse the bodies of functions. They are replaced
+    by a `LazySuite`, that parses them on access.
+
+    Sets ``failed`` if error recovery was needed, its results may differ from
+    the ones of a normal parser.
+    """
+    def __init__(self, grammar, source, module_path=None, tokenizer=None):
+        self._grammar = grammar
+        # The bodies are parsed later with the grammar of this name, the
+        # grammar itself is too big to be pickled with every body.
+        self.grammar_name = _grammar_name(grammar)
+        self.failed = False
+        self.lazy_suites = []
+        # The skipped bodies by the position of their INDENT.
+        self._skipped = {}
+        super(SkeletonParser, self).__init__(grammar, source, module_path,
+                                             tokenizer)
+        if self._skipped or any(not isinstance(suite.parent, tree.Function)
+                                for suite in self.lazy_suites):
+            self.failed = True
+
+    def convert_node(self, grammar, type, children):
+        if grammar.number2symbol[type] == 'suite':
+            try:
+                suite = self._skipped.pop(children[1]._start_pos)
+            except (IndexError, AttributeError, KeyError):
+                pass
+            else:
+                self.lazy_suites.append(suite)
+                return suite
+
+        node = super(SkeletonParser, self).convert_node(grammar, type, children)
+        if node.type == 'funcdef' and isinstance(children[-1], LazySuite):
+            node.names_dict = children[-1].set_names_dict(node.names_dict)
+        return node
+
+    def error_recovery(self, grammar, stack, typ, *args):
+        if typ != INDENT:
+            # The fast parser starts parsers in indented code, that's fine.
+            self.failed = True
+        return super(SkeletonParser, self).error_recovery(grammar, stack, typ,
+                                                          *args)
+
+    def _tokenize(self, tokenizer):
+        return super(SkeletonParser, self)._tokenize(self._skip_bodies(tokenizer))
+
+    def _skip_bodies(self, tokenizer):
+        tokens = iter(tokenizer)
+        new_statement = True
+        for token in tokens:
+            if token[0] == NAME and token[1] == 'def' and new_statement:
+                function_tokens = self._function_tokens(token, tokens)
+                for t in function_tokens:
+                    yield t
+                token = function_tokens[-1]
+            else:
+                yield token
+            new_statement = token[0] in (NEWLINE, INDENT, DEDENT)
+
+    def _function_tokens(self, def_token, tokens):
+        """
+        Reads a function. Returns its tokens, with the body replaced by a
+        ``pass`` if it can be parsed later.
+        """
+        header = [def_token]
+        level = 0
+        for token in tokens:
+            header.append(token)
+            typ, value = token[:2]
+            if typ == OP:
+                if value in '([{':
+                    level += 1
+                elif value in ')]}':
+                    level -= 1
+                elif value == ':' and not level:
+                    break
+            elif typ in (NEWLINE, INDENT, DEDENT, ENDMARKER, ERRORTOKEN):
+                return header
+        else:
+            return header
+
+        # Only bodies in an indented block are skipped.
+        for typ in (NEWLINE, INDENT):
+            token = next(tokens, None)
+            if token is None:
+                return header
+            header.append(token)
+            if token[0] != typ:
+                return header
+
+        body = []
+        depth = 1
+        for token in tokens:
+            typ = token[0]
+            if typ == INDENT:
+                depth += 1
+            elif typ == DEDENT:
+                depth -= 1
+                if not depth:
+                    break
+            elif typ in (ENDMARKER, ERRORTOKEN):
+                return header + body + [token]
+            body.append(token)
+        else:
+            return header + body
+        dedent = token
+
+        _, _, (line, column), prefix = def_token
+        indentation = prefix[prefix.rfind('\n') + 1:]
+        names = frozenset(t[1] for t in body if t[0] == NAME)
+        last = [t for t in body if t[0] != DEDENT][-1:]
+        if not last or len(indentation) != column or indentation.strip() \
+                or 'global' in names \
+                or last[0][0] != NEWLINE or not last[0][1].endswith('\n'):
+            # `global` changes the names of the module.
+            return header + body + [dedent]
+
+        source = indentation + 'def' \
+            + ''.join(t[3] + t[1] for t in header[1:] + body)
+        indent = header[-1]
+        suite = LazySuite(source, names, line - 1, header[-2][2],
+                          (dedent[2], dedent[3]), self)
+        self._skipped[indent[2]] = suite
+        return header + [(NAME, 'pass', indent[2], ''),
+                         (NEWLINE, '', indent[2], ''), dedent]
+
+
 class FastParser(use_metaclass(CachedFastParser)):
     _FLOWS_NEED_SPACE = 'if', 'elif', 'while', 'with', 'except', 'for'
     _FLOWS_NEED_COLON = 'else', 'try', 'except', 'finally'
@@ -235,22 +686,31 @@ class FastParser(use_metaclass(CachedFastParser)):
                              % ('|'.join(_FLOWS_NEED_SPACE),
                                 '|'.join(_FLOWS_NEED_COLON)))
 
-    def __init__(self, grammar, source, module_path=None):
+    def __init__(self, grammar, source, module_path=None, skeleton=False):
         # set values like `tree.Module`.
         self._grammar = grammar
         self.module_path = module_path
+        # Function bodies are only parsed when they are needed, see
+        # `LazySuite`. Meant for modules that are imported, not edited.
+        self.skeleton = skeleton
         self._reset_caches()
         self.update(source)
 
     def _reset_caches(self):
         self.module = FastModule(self.module_path)
         self.current_node = ParserNode(self.module, self, '')
+        self._lines = []
+        # The parts of the last update as ``(line, state, text)``, see
+        # `_split_lines`.
+        self._parts = []
 
     def update(self, source):
         # For testing purposes: It is important that the number of parsers used
         # can be minimized. With these variables we can test against that.
         self.number_parsers_used = 0
         self.number_of_splits = 0
+        # Splitting is incremental as well, only changed lines are split.
+        self.number_of_lines_split = 0
         self.number_of_misses = 0
         self.module.reset_caches()
         try:
@@ -266,11 +726,80 @@ class FastParser(use_metaclass(CachedFastParser)):
         parse each part seperately and therefore cache parts of the file and
         not everything.
         """
+        # Split only new lines. Distinction between \r\n is the tokenizer's
+        # job.
+        # It seems like there's no problem with form feed characters here,
+        # because we're not counting lines.
+        self._lines = source.splitlines(True)
+        for line, state, text in self._split_lines(0, _INITIAL_SPLIT_STATE):
+            yield text
+
+    def _split_incrementally(self, source):
+        """
+        Like `_split_parts`, but only splits the lines that changed since the
+        last update again. The parts before and after them are taken from the
+        last update.
+        """
+        old_lines, old_parts = self._lines, self._parts
+        lines = self._lines = source.splitlines(True)
+        if not old_parts:
+            self._parts = list(self._split_lines(0, _INITIAL_SPLIT_STATE))
+            self.number_of_lines_split = len(lines)
+            self.number_of_splits = len(self._parts)
+            return [text for line, state, text in self._parts]
+
+        # The lines `old_lines[first:old_end]` were replaced by
+        # `lines[first:new_end]`.
+        first, old_end, new_end = _changed_lines(old_lines, lines)
+        line_diff = new_end - old_end
+        # The end of a part is decided by the first line of the next part, so
+        # the part before the first changed line needs to be split again.
+        index = 0
+        for i, (line, state, text) in enumerate(old_parts):
+            if line > first:
+                break
+            index = i
+        index = max(index - 1, 0)
+        parts = old_parts[:index]
+        old_starts = dict((line, i) for i, (line, state, text)
+                          in enumerate(old_parts[index:], index))
+
+        start_line, state, text = old_parts[index]
+        end_line = len(lines)
+        if first == old_end == new_end:
+            # Nothing changed.
+            parts = old_parts
+            end_line = start_line
+        else:
+            for part in self._split_lines(start_line, state):
+                line, state, text = part
+                if line >= new_end:
+                    # Only unchanged lines follow. If the splitter is in the
+                    # same state as last time, the parts are the same as well.
+                    i = old_starts.get(line - line_diff)
+                    if i is not None and old_parts[i][1] == state:
+                        parts += [(l + line_diff, st, t)
+                                  for l, st, t in old_parts[i:]]
+                        end_line = line
+                        break
+                parts.append(part)
+        self._parts = parts
+        self.number_of_lines_split = end_line - start_line
+        self.number_of_splits = len(parts)
+        return [text for line, state, text in parts]
+
+    def _split_lines(self, start, state):
+        """
+        Splits `self._lines`, starting with the line `start` and the splitter
+        state `state`. Yields ``(line, state, text)`` for each part, where
+        ``line`` is the index of the first line of the part and ``state`` is
+        the splitter state before it. The splitting can later be resumed at
+        the start of any part with this state.
+        """
         def gen_part():
             text = ''.join(current_lines)
             del current_lines[:]
-            self.number_of_splits += 1
-            return text
+            return part_start, part_state, text
 
         def just_newlines(current_lines):
             for line in current_lines:
@@ -279,31 +808,29 @@ class FastParser(use_metaclass(CachedFastParser)):
                     return False
             return True
 
-        # Split only new lines. Distinction between \r\n is the tokenizer's
-        # job.
-        # It seems like there's no problem with form feed characters here,
-        # because we're not counting lines.
-        self._lines = source.splitlines(True)
+        lines = self._lines
         current_lines = []
-        is_decorator = False
-        # Use -1, because that indent is always smaller than any other.
-        indent_list = [-1, 0]
-        new_indent = False
-        parentheses_level = 0
-        flow_indent = None
+        part_start, part_state = start, state
+        indent_list, new_indent, parentheses_level, flow_indent, \
+            is_decorator = state
+        indent_list = list(indent_list)
         previous_line = None
         # All things within flows are simply being ignored.
-        for i, l in enumerate(self._lines):
+        for i in range(start, len(lines)):
+            l = lines[i]
             # Handle backslash newline escaping.
             if l.endswith('\\\n') or l.endswith('\\\r\n'):
                 if previous_line is not None:
                     previous_line += l
                 else:
                     previous_line = l
+                    line_start = i
                 continue
             if previous_line is not None:
                 l = previous_line + l
                 previous_line = None
+            else:
+                line_start = i
 
             # check for dedents
             s = l.lstrip('\t \n\r')
@@ -312,6 +839,8 @@ class FastParser(use_metaclass(CachedFastParser)):
                 current_lines.append(l)  # Just ignore comments and blank lines
                 continue
 
+            line_state = (tuple(indent_list), new_indent, parentheses_level,
+                          flow_indent, is_decorator)
             if new_indent:
                 if indent > indent_list[-2]:
                     # Set the actual indent, not just the random old indent + 1.
@@ -325,6 +854,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                 new_indent = False
                 if flow_indent is None and current_lines and not parentheses_level:
                     yield gen_part()
+                    part_start, part_state = line_start, line_state
                 flow_indent = None
 
             # Check lines for functions/classes and split the code there.
@@ -338,6 +868,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                     else:
                         if not is_decorator and not just_newlines(current_lines):
                             yield gen_part()
+                            part_start, part_state = line_start, line_state
                     is_decorator = '@' == m.group(1)
                     if not is_decorator:
                         parentheses_level = 0
@@ -368,18 +899,21 @@ class FastParser(use_metaclass(CachedFastParser)):
 
         next_line_offset = line_offset = 0
         start = 0
-        nodes = list(self.current_node.all_sub_nodes())
+        # The old nodes by their source, to reuse them for unchanged parts.
+        nodes = {}
+        for node in self.current_node.all_sub_nodes():
+            nodes.setdefault(node.source, []).append(node)
         # Now we can reset the node, because we have all the old nodes.
         self.current_node.reset_node()
         last_end_line = 1
 
-        for code_part in self._split_parts(source):
+        for code_part in self._split_incrementally(source):
             next_line_offset += code_part.count('\n')
             # If the last code part parsed isn't equal to the current end_pos,
             # we know that the parser went further (`def` start in a
             # docstring). So just parse the next part.
             if line_offset + 1 == last_end_line:
-                self.current_node = self._get_node(code_part, source[start:],
+                self.current_node = self._get_node(code_part, source, start,
                                                    line_offset, nodes)
             else:
                 # Means that some lines where not fully parsed. Parse it now.
@@ -393,7 +927,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                     # complicated and error-prone. Since this is not very often
                     # called - just ignore it.
                     src = ''.join(self._lines[line_offset:])
-                    self.current_node = self._get_node(code_part, src,
+                    self.current_node = self._get_node(code_part, src, 0,
                                                        line_offset, nodes)
                     last_end_line = self.current_node.parser.module.end_pos[0]
 
@@ -416,34 +950,61 @@ class FastParser(use_metaclass(CachedFastParser)):
                   % (self.module_path, self.number_parsers_used,
                      self.number_of_splits))
 
-    def _get_node(self, source, parser_code, line_offset, nodes):
+    def _get_node(self, source, parser_code, start, line_offset, nodes):
         """
-        Side effect: Alters the list of nodes.
+        Side effect: Alters the dict of nodes.
         """
         indent = len(source) - len(source.lstrip('\t '))
         self.current_node = self.current_node.parent_until_indent(indent)
 
-        h = hash(source)
-        for index, node in enumerate(nodes):
-            if node.hash == h and node.source == source:
-                node.reset_node()
-                nodes.remove(node)
-                break
-        else:
-            tokenizer = FastTokenizer(parser_code)
+        try:
+            node = nodes[source].pop(0)
+        except (KeyError, IndexError):
+            # Only the code of changed parts is copied.
+            parser_code = parser_code[start:]
             self.number_parsers_used += 1
-            p = Parser(self._grammar, parser_code, self.module_path, tokenizer=tokenizer)
+            p = None
+            if self.skeleton:
+                p = SkeletonParser(self._grammar, parser_code, self.module_path,
+                                   tokenizer=FastTokenizer(parser_code))
+                if p.failed:
+                    # Error recovery doesn't know about skipped bodies.
+                    p = None
+            if p is None:
+                tokenizer = FastTokenizer(parser_code)
+                p = Parser(self._grammar, parser_code, self.module_path,
+                           tokenizer=tokenizer)
 
             end = line_offset + p.module.end_pos[0]
             used_lines = self._lines[line_offset:end - 1]
             code_part_actually_used = ''.join(used_lines)
 
             node = ParserNode(self.module, p, code_part_actually_used)
+        else:
+            node.reset_node()
 
         self.current_node.add_node(node, line_offset)
         return node
 
 
+def _changed_lines(old_lines, new_lines):
+    """
+    Returns ``(first, old_end, new_end)``: ``old_lines[first:old_end]`` have
+    been replaced by ``new_lines[first:new_end]``, all the other lines are
+    equal.
+    """
+    length = min(len(old_lines), len(new_lines))
+    first = 0
+    while first < length and old_lines[first] == new_lines[first]:
+        first += 1
+    old_end, new_end = len(old_lines), len(new_lines)
+    while old_end > first and new_end > first \
+            and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return first, old_end, new_end
+
+
 class FastTokenizer(object):
     """
     Breaks when certain conditions are met, i.e. a new function or class opens.
@@ -14,9 +14,15 @@ See Parser/parser.c in the Python distribution for additional info on
 how this parsing engine works.
 """
 
+import weakref
+
 # Local imports
 from jedi.parser import tokenize
 
+# The tables of `make_transitions` by grammar. They are not stored on the
+# grammar, because parsers are pickled together with their grammar.
+_transitions = weakref.WeakKeyDictionary()
+
 
 class ParseError(Exception):
     """Exception to signal the parser is stuck."""
@@ -30,6 +36,33 @@ class ParseError(Exception):
         self.start_pos = start_pos
 
 
+def make_transitions(grammar):
+    """
+    Precomputes what the parser does with a token in each DFA state, so that
+    it doesn't have to search the arcs and first sets for every token.
+
+    Returns ``{symbol: [{label: (new state, symbol to push or None)}]}`` with
+    one dict per state of the symbol's DFA. ``None`` means that the token is
+    shifted. If there's no entry, the state is left or the token is an error.
+    """
+    transitions = {}
+    for symbol, (states, first) in grammar.dfas.items():
+        state_transitions = []
+        for arcs in states:
+            labels = {}
+            # The first matching arc wins, like in a linear search.
+            for label, newstate in arcs:
+                t, v = grammar.labels[label]
+                if t >= 256:
+                    for first_label in grammar.dfas[t][1]:
+                        labels.setdefault(first_label, (newstate, t))
+                elif label != 0:  # 0 marks an accepting state.
+                    labels.setdefault(label, (newstate, None))
+            state_transitions.append(labels)
+        transitions[symbol] = state_transitions
+    return transitions
+
+
 class PgenParser(object):
     """Parser engine.
 
@@ -89,6 +122,10 @@ class PgenParser(object):
         self.grammar = grammar
         self.convert_node = convert_node
         self.convert_leaf = convert_leaf
+        try:
+            self._transitions = _transitions[grammar]
+        except KeyError:
+            self._transitions = _transitions[grammar] = make_transitions(grammar)
 
         # Prepare for parsing.
         start = self.grammar.start
@@ -129,37 +166,11 @@ class PgenParser(object):
         # Loop until the token is shifted; may raise exceptions
         while True:
             dfa, state, node = self.stack[-1]
-            states, first = dfa
-            arcs = states[state]
-            # Look for a state with this label
-            for i, newstate in arcs:
-                t, v = self.grammar.labels[i]
-                if ilabel == i:
-                    # Look it up in the list of labels
-                    assert t < 256
-                    # Shift a token; we're done with it
-                    self.shift(type, value, newstate, prefix, start_pos)
-                    # Pop while we are in an accept-only state
-                    state = newstate
-                    while states[state] == [(0, state)]:
-                        self.pop()
-                        if not self.stack:
-                            # Done parsing!
-                            return True
-                        dfa, state, node = self.stack[-1]
-                        states, first = dfa
-                    # Done with this token
-                    return False
-                elif t >= 256:
-                    # See if it's a symbol and if we're in its first set
-                    itsdfa = self.grammar.dfas[t]
-                    itsstates, itsfirst = itsdfa
-                    if ilabel in itsfirst:
-                        # Push a symbol
-                        self.push(t, itsdfa, newstate)
-                        break  # To continue the outer while loop
-            else:
-                if (0, state) in arcs:
+            try:
+                newstate, t = self._transitions[node[0]][state][ilabel]
+            except KeyError:
+                states, first = dfa
+                if (0, state) in states[state]:
                     # An accepting state, pop it and try something else
                     self.pop()
                     if not self.stack:
@@ -169,6 +180,26 @@ class PgenParser(object):
                     self.error_recovery(self.grammar, self.stack, type,
                                         value, start_pos, prefix, self.addtoken)
                     break
+            else:
+                if t is not None:
+                    # Push a symbol
+                    self.push(t, self.grammar.dfas[t], newstate)
+                    continue
+
+                # Shift a token; we're done with it
+                self.shift(type, value, newstate, prefix, start_pos)
+                # Pop while we are in an accept-only state
+                states, first = dfa
+                state = newstate
+                while states[state] == [(0, state)]:
+                    self.pop()
+                    if not self.stack:
+                        # Done parsing!
+                        return True
+                    dfa, state, node = self.stack[-1]
+                    states, first = dfa
+                # Done with this token
+                return False
 
     def shift(self, type, value, newstate, prefix, start_pos):
         """Shift a token.  (Internal)"""
@@ -139,19 +139,35 @@ for t in ("'", '"',
           "uR'", 'uR"', "UR'", 'UR"'):
     single_quoted[t] = t
 
+# The same tokens as ``pseudo_token``, but the name of the group that matched
+# tells the kind of the token (used by ``_generate_buffer_tokens``). ASCII names
+# that cannot start a string, operators and newlines are by far the most common
+# tokens. They cannot be confused with anything else and are therefore tried
+# first.
+buffer_pseudo_token = group(whitespace) + '(?:%s)' % '|'.join(
+    '(?P<%s>%s)' % kind for kind in [
+        ('name', r'[ac-qstv-zAC-QSTV-Z_]\w*'),
+        ('op', group(operator, bracket, r'[:;,@]')),
+        ('newline', r'\r?\n'),
+        ('backslash', r'\\\r?\n'), ('comment', comment), ('triple', triple),
+        ('number', number), ('dot', r'\.\.\.|\.'),
+        ('string', cont_str), ('other_name', name)
+    ])
+buffer_pseudoprog = _compile(buffer_pseudo_token)
+
 del _compile
 
 tabsize = 8
 
 ALWAYS_BREAK_TOKENS = (';', 'import', 'from', 'class', 'def', 'try', 'except',
                        'finally', 'while', 'return')
+_always_break_tokens = frozenset(ALWAYS_BREAK_TOKENS)
 
 
 def source_tokens(source):
     """Generate tokens from a the source code (string)."""
     source = source + '\n'  # end with \n, because the parser needs it
-    readline = StringIO(source).readline
-    return generate_tokens(readline)
+    return _generate_buffer_tokens(source)
 
 
 def generate_tokens(readline):
@@ -288,3 +304,142 @@ def generate_tokens(readline):
     for indent in indents[1:]:
         yield DEDENT, '', end_pos, ''
     yield ENDMARKER, '', end_pos, prefix
+
+
+def _find_string_end(endprog, source, line_start, line_end, lnum):
+    """
+    Searches the end of a string that continues on the lines after
+    ``line_end``. Returns the end offset (``None`` if the string never ends)
+    and the boundaries and number of the line the search stopped in.
+    """
+    while line_end < len(source):
+        line_start = line_end
+        line_end = source.find('\n', line_start) + 1 or len(source)
+        lnum += 1
+        endmatch = endprog.match(source, line_start, line_end)
+        if endmatch:
+            return endmatch.end(0), line_start, line_end, lnum
+    return None, line_start, line_end, lnum
+
+
+def _generate_buffer_tokens(source):
+    """
+    The same as :func:`generate_tokens`, but scans one string with offsets
+    instead of reading it line by line. Lines are never copied, regexes are
+    matched with ``endpos`` set to the end of the current line and strings that
+    span multiple lines are sliced once they are complete. The kind of a token
+    is the name of the regex group that matched it, so most tokens need a
+    single comparison instead of a chain of checks on their first character.
+
+    This generator must yield exactly the same tokens as ``generate_tokens``,
+    which is checked by the tests. Change both or neither.
+    """
+    match = buffer_pseudoprog.match
+    find = source.find
+    source_len = len(source)
+    paren_level = 0
+    indents = [0]
+    lnum = 0
+    new_line = True
+    prefix = ''
+    additional_prefix = ''
+    line_start = line_end = 0
+    while line_end < source_len:                       # loop over lines
+        line_start = line_end
+        line_end = find('\n', line_start) + 1 or source_len
+        lnum += 1
+        pos = line_start
+
+        while pos < line_end:
+            pseudomatch = match(source, pos, line_end)
+            if not pseudomatch:
+                txt = source[pos]
+                if txt in '"\'':
+                    txt = source[pos:line_end]
+                yield ERRORTOKEN, txt, (lnum, pos - line_start), prefix
+                pos += 1
+                continue
+
+            start = pseudomatch.end(1)
+            prefix = additional_prefix + source[pos:start]
+            additional_prefix = ''
+            pos = pseudomatch.end()
+            kind = pseudomatch.lastgroup
+            column = start - line_start
+            spos = (lnum, column)
+            token = source[start:pos]
+
+            if new_line and kind != 'newline' and kind != 'comment':
+                new_line = False
+                if paren_level == 0:
+                    if column > indents[-1]:
+                        yield INDENT, '', spos, ''
+                        indents.append(column)
+                    while column < indents[-1]:
+                        yield DEDENT, '', spos, ''
+                        indents.pop()
+
+            if kind == 'name' or kind == 'other_name' and \
+                    is_identifier(token[0]):
+                if token in _always_break_tokens:
+                    paren_level = 0
+                    while True:
+                        indent = indents.pop()
+                        if indent > column:
+                            yield DEDENT, '', spos, ''
+                        else:
+                            indents.append(indent)
+                            break
+                yield NAME, token, spos, prefix
+            elif kind == 'op':
+                if token in '([{':
+                    paren_level += 1
+                elif token in ')]}':
+                    paren_level -= 1
+                yield OP, token, spos, prefix
+            elif kind == 'newline':
+                if not new_line and paren_level == 0:
+                    yield NEWLINE, token, spos, prefix
+                else:
+                    additional_prefix = prefix + token
+                new_line = True
+            elif kind == 'number':
+                yield NUMBER, token, spos, prefix
+            elif kind == 'string':
+                if token[-1] == '\n':                       # continued string
+                    endprog = (endprogs.get(token[0]) or endprogs.get(token[1])
+                               or endprogs.get(token[2]))
+                    pos, line_start, line_end, lnum = _find_string_end(
+                        endprog, source, line_start, line_end, lnum)
+                    if pos is None:
+                        yield ERRORTOKEN, source[start:], spos, prefix
+                        break
+                    yield STRING, source[start:pos], spos, prefix
+                else:                                       # ordinary string
+                    yield STRING, token, spos, prefix
+            elif kind == 'comment':
+                additional_prefix = prefix + token
+            elif kind == 'triple':
+                endprog = endprogs[token]
+                endmatch = endprog.match(source, pos, line_end)
+                if endmatch:                                # all on one line
+                    pos = endmatch.end(0)
+                    yield STRING, source[start:pos], spos, prefix
+                else:                                       # multiple lines
+                    pos, line_start, line_end, lnum = _find_string_end(
+                        endprog, source, line_start, line_end, lnum)
+                    if pos is None:
+                        yield ERRORTOKEN, source[start:], spos, prefix
+                        break
+                    yield STRING, source[start:pos], spos, prefix
+            elif kind == 'backslash':    # continued stmt, ends the line
+                additional_prefix += prefix + token
+                break
+            else:
+                # Dots and the ``\w`` characters that cannot start a name.
+                yield OP, token, spos, prefix
+
+    end_pos = (lnum, line_end - line_start - 1)
+    for indent in indents[1:]:
+        yield DEDENT, '', end_pos, ''
+    yield ENDMARKER, '', end_pos, prefix
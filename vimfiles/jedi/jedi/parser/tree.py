@@ -56,6 +56,10 @@ class PositionModifier(object):
 
 zero_position_modifier = PositionModifier()
 
+# Leaves store their positions as ``line << _COLUMN_BITS | column``.
+_COLUMN_BITS = 32
+_COLUMN_MASK = (1 << _COLUMN_BITS) - 1
+
 
 class DocstringMixin(object):
     __slots__ = ()
@@ -145,8 +149,36 @@ class Base(object):
         return False
 
 
+def _child_index(node):
+    """
+    Returns the index of ``node`` in the children of its parent.
+
+    Every node remembers its last index. Children lists are changed in a lot
+    of places (the fast parser, error recovery, copies of executions), so the
+    index is only a hint that is checked. If it's wrong, the indexes of all
+    the siblings are refreshed at once.
+    """
+    children = node.parent.children
+    try:
+        index = node._index
+        if children[index] is node:
+            return index
+    except (AttributeError, IndexError):
+        pass  # Never looked up or the children changed.
+
+    found = None
+    for i, child in enumerate(children):
+        child._index = i
+        if child is node:
+            found = i
+    if found is None:
+        raise ValueError('%s is not a child of its parent.' % node)
+    return found
+
+
 class Leaf(Base):
-    __slots__ = ('position_modifier', 'value', 'parent', '_start_pos', 'prefix')
+    __slots__ = ('position_modifier', 'value', 'parent', '_pos', 'prefix',
+                 '_index')
 
     def __init__(self, position_modifier, value, start_pos, prefix=''):
         self.position_modifier = position_modifier
@@ -155,9 +187,23 @@ class Leaf(Base):
         self.prefix = prefix
         self.parent = None
 
+    @property
+    def _start_pos(self):
+        """
+        The position without the position modifier. It's stored as one
+        integer, a tuple per leaf would take a lot more memory.
+        """
+        pos = self._pos
+        return pos >> _COLUMN_BITS, pos & _COLUMN_MASK
+
+    @_start_pos.setter
+    def _start_pos(self, value):
+        self._pos = (value[0] << _COLUMN_BITS) + value[1]
+
     @property
     def start_pos(self):
-        return self._start_pos[0] + self.position_modifier.line, self._start_pos[1]
+        pos = self._pos
+        return (pos >> _COLUMN_BITS) + self.position_modifier.line, pos & _COLUMN_MASK
 
     @start_pos.setter
     def start_pos(self, value):
@@ -165,12 +211,12 @@ class Leaf(Base):
 
     @property
     def end_pos(self):
-        return (self._start_pos[0] + self.position_modifier.line,
-                self._start_pos[1] + len(self.value))
+        pos = self._pos
+        return ((pos >> _COLUMN_BITS) + self.position_modifier.line,
+                (pos & _COLUMN_MASK) + len(self.value))
 
     def move(self, line_offset, column_offset):
-        self._start_pos = (self._start_pos[0] + line_offset,
-                           self._start_pos[1] + column_offset)
+        self._pos += (line_offset << _COLUMN_BITS) + column_offset
 
     def get_previous(self):
         """
@@ -178,14 +224,13 @@ class Leaf(Base):
         """
         node = self
         while True:
-            c = node.parent.children
-            i = c.index(self)
+            i = _child_index(node)
             if i == 0:
                 node = node.parent
                 if node.parent is None:
                     raise IndexError('Cannot access the previous element of the first one.')
             else:
-                node = c[i - 1]
+                node = node.parent.children[i - 1]
                 break
 
         while True:
@@ -202,13 +247,10 @@ class Leaf(Base):
         The node immediately following the invocant in their parent's children
         list. If the invocant does not have a next sibling, it is None
         """
-        # Can't use index(); we need to test by identity
-        for i, child in enumerate(self.parent.children):
-            if child is self:
-                try:
-                    return self.parent.children[i + 1]
-                except IndexError:
-                    return None
+        try:
+            return self.parent.children[_child_index(self) + 1]
+        except (IndexError, ValueError):
+            return None
 
     def prev_sibling(self):
         """
@@ -216,12 +258,13 @@ class Leaf(Base):
         children list. If the invocant does not have a previous sibling, it is
         None.
         """
-        # Can't use index(); we need to test by identity
-        for i, child in enumerate(self.parent.children):
-            if child is self:
-                if i == 0:
-                    return None
-                return self.parent.children[i - 1]
+        try:
+            i = _child_index(self)
+        except ValueError:
+            return None
+        if i == 0:
+            return None
+        return self.parent.children[i - 1]
 
     @utf8_repr
     def __repr__(self):
@@ -398,12 +441,44 @@ class Keyword(Leaf):
         return hash(self.value)
 
 
+def _first_child_at(children, position):
+    """
+    Returns the index of the first child that can contain ``position``. That's
+    the last child that starts before it, all the children in front of it
+    end before it. Children are ordered by their start positions, so this is
+    a binary search.
+
+    Empty leaves are never probed: The fast parser leaves the end markers of
+    its parsers in the tree and their positions are meaningless. For the
+    same reason the end positions of nodes are not used.
+    """
+    lo, hi = 0, len(children)
+    while lo < hi:
+        mid = probe = (lo + hi) // 2
+        while probe < hi and _is_empty(children[probe]):
+            probe += 1
+        if probe == hi:
+            hi = mid
+        elif children[probe].start_pos < position:
+            lo = probe + 1
+        else:
+            hi = mid
+    lo -= 1
+    while lo > 0 and _is_empty(children[lo]):
+        lo -= 1
+    return max(lo, 0)
+
+
+def _is_empty(node):
+    return isinstance(node, Leaf) and not node.value
+
+
 class BaseNode(Base):
     """
     The super class for Scope, Import, Name and Statement. Every object in
     the parser tree inherits from this class.
     """
-    __slots__ = ('children', 'parent')
+    __slots__ = ('children', 'parent', '_index')
     type = None
 
     def __init__(self, children):
@@ -437,9 +512,15 @@ class BaseNode(Base):
 
     @Python3Method
     def name_for_position(self, position):
-        for c in self.children:
+        children = self.children
+        for i in range(_first_child_at(children, position), len(children)):
+            c = children[i]
+            if _is_empty(c):
+                continue
+            if c.start_pos > position:
+                break
             if isinstance(c, Leaf):
-                if isinstance(c, Name) and c.start_pos <= position <= c.end_pos:
+                if isinstance(c, Name) and c.end_pos >= position:
                     return c
             else:
                 result = c.name_for_position(position)
@@ -449,7 +530,11 @@ class BaseNode(Base):
 
     @Python3Method
     def get_statement_for_position(self, pos):
-        for c in self.children:
+        children = self.children
+        for i in range(_first_child_at(children, pos), len(children)):
+            c = children[i]
+            if not _is_empty(c) and c.start_pos > pos:
+                break
             if c.start_pos <= pos <= c.end_pos:
                 if c.type not in ('decorated', 'simple_stmt', 'suite') \
                         and not isinstance(c, (Flow, ClassOrFunc)):
@@ -516,7 +601,7 @@ class Scope(BaseNode, DocstringMixin):
     :param start_pos: The position (line and column) of the scope.
     :type start_pos: tuple(int, int)
     """
-    __slots__ = ('names_dict',)
+    __slots__ = ('names_dict', '_scope_index')
 
     def __init__(self, children):
         super(Scope, self).__init__(children)
@@ -525,19 +610,19 @@ class Scope(BaseNode, DocstringMixin):
     def returns(self):
         # Needed here for fast_parser, because the fast_parser splits and
         # returns will be in "normal" modules.
-        return self._search_in_scope(ReturnStmt)
+        return self._cached_search(ReturnStmt)
 
     @property
     def subscopes(self):
-        return self._search_in_scope(Scope)
+        return self._cached_search(Scope)
 
     @property
     def flows(self):
-        return self._search_in_scope(Flow)
+        return self._cached_search(Flow)
 
     @property
     def imports(self):
-        return self._search_in_scope(Import)
+        return self._cached_search(Import)
 
     @Python3Method
     def _search_in_scope(self, typ):
@@ -553,9 +638,32 @@ class Scope(BaseNode, DocstringMixin):
 
         return scan(self.children)
 
+    def _cached_search(self, typ):
+        """
+        The same as `_search_in_scope`, but the result is cached until
+        `clear_scope_index` is called.
+        """
+        try:
+            index = self._scope_index
+        except AttributeError:
+            index = self._scope_index = {}
+        try:
+            return index[typ]
+        except KeyError:
+            result = index[typ] = self._search_in_scope(typ)
+            return result
+
+    def clear_scope_index(self):
+        """
+        Drops the cached searches (`subscopes`, `imports`, etc.). This has to
+        be called after changing the children of the scope or of its suites
+        and flows.
+        """
+        self._scope_index = {}
+
     @property
     def statements(self):
-        return self._search_in_scope((ExprStmt, KeywordStatement))
+        return self._cached_search((ExprStmt, KeywordStatement))
 
     def is_scope(self):
         return True
@@ -615,9 +723,10 @@ class Module(Scope):
             string = ''  # no path -> empty name
         else:
             sep = (re.escape(os.path.sep),) * 2
-            r = re.search(r'([^%s]*?)(%s__init__)?(\.py|\.so)?$' % sep, self.path)
-            # Remove PEP 3149 names
-            string = re.sub('\.[a-z]+-\d{2}[mud]{0,3}$', '', r.group(1))
+            r = re.search(r'([^%s]*?)(%s__init__)?(\.py|\.so|\.pyd)?$' % sep, self.path)
+            # Remove PEP 3149 names, e.g. `.cpython-34m` or
+            # `.cpython-311-x86_64-linux-gnu`.
+            string = re.sub('\.[a-z]+-\d{2,3}[mud]{0,3}(-[\w-]+)?$', '', r.group(1))
         # Positions are not real, but a module starts at (1, 0)
         p = (1, 0)
         name = Name(zero_position_modifier, string, p)
@@ -773,7 +882,7 @@ class Function(ClassOrFunc):
     @property
     def yields(self):
         # TODO This is incorrect, yields are also possible in a statement.
-        return self._search_in_scope(YieldExpr)
+        return self._cached_search(YieldExpr)
 
     def is_generator(self):
         return bool(self.yields)
@@ -1193,7 +1302,7 @@ class Param(BaseNode):
 
     @property
     def position_nr(self):
-        return self.parent.children.index(self) - 1
+        return _child_index(self) - 1
 
     @property
     def parent_function(self):
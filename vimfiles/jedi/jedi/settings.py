@@ -11,6 +11,14 @@ Example usage::
     from jedi import settings
     settings.case_insensitive_completion = True
 
+The completion, recursion and dynamism settings can also be given for a
+single :class:`jedi.Script`, e.g. if scripts are evaluated in several threads::
+
+    request_settings = jedi.RequestSettings(dynamic_params=False)
+    jedi.Script(source, request_settings=request_settings)
+
+Filesystem cache settings are always global.
+
 
 Completion output
 ~~~~~~~~~~~~~~~~~
@@ -26,12 +34,16 @@ Filesystem cache
 
 .. autodata:: cache_directory
 .. autodata:: use_filesystem_cache
+.. autodata:: check_source_hash
 
 
 Parser
 ~~~~~~
 
 .. autodata:: fast_parser
+.. autodata:: skeleton_parsing
+.. autodata:: prefetch_imports
+.. autodata:: compiled_module_stubs
 
 
 Dynamic stuff
@@ -114,6 +126,13 @@ use_filesystem_cache = True
 Use filesystem cache to save once parsed files with pickle.
 """
 
+check_source_hash = True
+"""
+If the modification time of a file changed, check if its content changed as
+well before parsing it again. ``git checkout`` or reinstalling packages
+touch a lot of files without changing them.
+"""
+
 if platform.system().lower() == 'windows':
     _cache_directory = os.path.join(os.getenv('APPDATA') or '~', 'Jedi',
                                     'Jedi')
@@ -143,6 +162,26 @@ something has been changed e.g. to a function. If this happens, only the
 function is being reparsed.
 """
 
+skeleton_parsing = True
+"""
+Don't parse the bodies of functions in imported modules, until they are
+needed. Most of them never are, this saves time and memory.
+"""
+
+prefetch_imports = False
+"""
+Parse the modules that a module imports in a process pool, as soon as the
+module is loaded. Needs ``concurrent.futures`` (Python 3 or the ``futures``
+backport). It pays off on multi-core machines with a cold cache.
+"""
+
+compiled_module_stubs = True
+"""
+Don't import compiled modules (C extensions) into the |jedi| process. They
+are introspected in a separate process once, the result is stored as a stub
+in the cache directory, see :mod:`jedi.evaluate.compiled.stubs`.
+"""
+
 # ----------------
 # dynamic stuff
 # ----------------
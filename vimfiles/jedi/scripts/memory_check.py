@@ -6,28 +6,46 @@ large libraries.
 Each library is preloaded by jedi, recording the time and memory consumed by
 each operation.
 
-You can provide additional libraries via command line arguments.
+You can provide additional libraries via command line arguments. ``stdlib``
+preloads all the modules of the standard library.
 
 Note: This requires the psutil library, available on PyPI.
 """
 import time
 import sys
 import os
+import re
+import sysconfig
 import psutil
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
 import jedi
 
 
 def used_memory():
-    """Return the total MB of System Memory in use."""
-    return psutil.virtual_memory().used / 2 ** 20
+    """Return the MB of memory used by this process."""
+    return psutil.Process(os.getpid()).memory_info().rss / 2 ** 20
+
+
+def stdlib_modules():
+    """Return the names of the top level modules of the standard library."""
+    path = sysconfig.get_paths()['stdlib']
+    for name in sorted(os.listdir(path)):
+        if name.endswith('.py'):
+            name = name[:-3]
+        elif not os.path.exists(os.path.join(path, name, '__init__.py')):
+            continue
+        if re.match(r'[a-zA-Z_]\w*$', name):
+            yield name
 
 
 def profile_preload(mod):
     """Preload a module into Jedi, recording time and memory used."""
     base = used_memory()
     t0 = time.time()
-    jedi.preload_module(mod)
+    if mod == 'stdlib':
+        jedi.preload_module(*stdlib_modules())
+    else:
+        jedi.preload_module(mod)
     elapsed = time.time() - t0
     used = used_memory() - base
     return elapsed, used
@@ -54,5 +72,6 @@ if __name__ == '__main__':
         mods = sys.argv[1:]
     else:
         mods = ['re', 'numpy', 'scipy', 'scipy.sparse', 'scipy.stats',
-                'wx', 'decimal', 'PyQt4.QtGui', 'PySide.QtGui', 'Tkinter']
+                'django', 'django.db.models', 'wx', 'decimal', 'PyQt4.QtGui',
+                'PySide.QtGui', 'Tkinter', 'stdlib']
     main(mods)
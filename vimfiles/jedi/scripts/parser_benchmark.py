@@ -0,0 +1,48 @@
+#! /usr/bin/env python
+"""
+Parses all Python files of the test directory (or the given directories)
+and prints how long the parser takes. The files are read and tokenized up
+front, so only the parser is measured.
+
+Usage: parser_benchmark.py [<number of runs>] [<directory> ...]
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
+from jedi import common
+from jedi.parser import Parser, load_grammar, tokenize
+
+
+def read_sources(directories):
+    for directory in directories:
+        for root, dirnames, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith('.py'):
+                    with open(os.path.join(root, filename), 'rb') as f:
+                        yield common.source_to_unicode(f.read())
+
+
+def main(number, directories):
+    grammar = load_grammar()
+    sources = list(read_sources(directories))
+    tokens = [list(tokenize.source_tokens(s)) for s in sources]
+    count = sum(len(t) for t in tokens)
+
+    times = []
+    for _ in range(number):
+        t0 = time.time()
+        for source, token_list in zip(sources, tokens):
+            Parser(grammar, source, tokenizer=iter(token_list))
+        times.append(time.time() - t0)
+
+    best = min(times)
+    print('%s files, %s tokens' % (len(sources), count))
+    print('best of %s: %.3fs, %.0f tokens/s' % (number, best, count / best))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    number = int(args.pop(0)) if args else 5
+    test_dir = os.path.join(os.path.dirname(__file__), '..', 'test')
+    main(number, args or [test_dir])
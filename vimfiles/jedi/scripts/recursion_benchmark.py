@@ -0,0 +1,52 @@
+#! /usr/bin/env python
+"""
+Runs the ``#?`` cases of recursion heavy files in test/completion (or of the
+given files) and prints how long they take. The recursion detectors check
+every statement and execution that is evaluated, long inference chains make
+them expensive.
+
+Usage: recursion_benchmark.py [<number of runs>] [<file> ...]
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
+import jedi
+
+FILES = 'functions.py', 'dynamic_arrays.py', 'classes.py', 'arrays.py'
+
+
+def read_cases(path):
+    with open(path) as f:
+        source = f.read()
+    lines = source.splitlines()
+    for i, line in enumerate(lines[:-1]):
+        if line.lstrip().startswith('#?'):
+            yield source, i + 2, len(lines[i + 1]), path
+
+
+def run(cases):
+    for source, line, column, path in cases:
+        try:
+            jedi.Script(source, line, column, path).goto_definitions()
+        except Exception:
+            pass  # The test suite cares about the results, not this script.
+
+
+def main(number, paths):
+    cases = [case for path in paths for case in read_cases(path)]
+    times = []
+    for _ in range(number):
+        t0 = time.time()
+        run(cases)
+        times.append(time.time() - t0)
+    print('%s cases in %s files' % (len(cases), len(paths)))
+    print('best of %s: %.3fs' % (number, min(times)))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    number = int(args.pop(0)) if args else 3
+    completion_dir = os.path.join(os.path.dirname(__file__), '..', 'test',
+                                  'completion')
+    main(number, args or [os.path.join(completion_dir, f) for f in FILES])
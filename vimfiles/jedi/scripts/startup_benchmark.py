@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+"""
+Measures the startup time of Jedi in fresh processes, once with the parser
+tables generated from the grammar files and once with the tables loaded from
+the cache directory. Loading the grammar alone is measured as well, because
+it's a small part of the startup and process creation is noisy.
+
+Usage: startup_benchmark.py [<number of runs>]
+"""
+import glob
+import os
+import subprocess
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
+from jedi import settings
+from jedi import parser
+from jedi.cache import ParserPickling
+from jedi.parser.pgen2.pgen import generate_grammar
+
+CODE = '''
+import sys
+import time
+sys.path.insert(0, %r)
+t0 = time.time()
+import jedi
+t1 = time.time()
+jedi.Script('import os; os.pa').completions()
+print('%%s %%s' %% (t1 - t0, time.time() - t1))
+''' % os.path.abspath(os.path.dirname(__file__) + '/..')
+
+
+def run(cached_tables):
+    if not cached_tables:
+        pattern = os.path.join(settings.cache_directory, ParserPickling.py_tag,
+                               'grammar*.pickle')
+        for path in glob.glob(pattern):
+            os.remove(path)
+    output = subprocess.check_output([sys.executable, '-c', CODE])
+    return [float(t) * 1000 for t in output.split()]
+
+
+def grammar_time(load, number):
+    path = os.path.join(os.path.dirname(parser.__file__), 'grammar3.4.txt')
+    t0 = time.time()
+    for _ in range(number):
+        load(path)
+    return (time.time() - t0) / number * 1000
+
+
+def main(number):
+    print('Grammar (ms) | Tables')
+    print('---------------------')
+    print('%12.2f | generated' % grammar_time(generate_grammar, number))
+    print('%12.2f | cached' % grammar_time(parser._load_grammar_tables, number))
+    print('')
+
+    run(True)  # Fill the parser cache.
+    print('import jedi (ms) | First completion (ms) | Tables')
+    print('---------------------------------------------------')
+    for cached_tables in False, True:
+        times = [run(cached_tables) for _ in range(number)]
+        print('%16.2f | %21.2f | %s' % (
+            min(t[0] for t in times), min(t[1] for t in times),
+            'cached' if cached_tables else 'generated'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if sys.argv[1:] else 5)
@@ -0,0 +1,43 @@
+"""
+A call chain of helpers without arguments. Every call site is a new execution
+of the next level.
+"""
+
+
+def level6():
+    items = [1.0, 2.0]
+    items.append(3.0)
+    return items
+
+
+def level5():
+    first = level6()
+    second = level6()
+    return first + second
+
+
+def level4():
+    first = level5()
+    second = level5()
+    return first + second
+
+
+def level3():
+    first = level4()
+    second = level4()
+    return first + second
+
+
+def level2():
+    first = level3()
+    second = level3()
+    return first + second
+
+
+def level1():
+    first = level2()
+    second = level2()
+    return first + second
+
+
+level1()[0].
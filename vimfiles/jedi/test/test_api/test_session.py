@@ -0,0 +1,97 @@
+"""
+Tests for ``jedi.api.session``.
+"""
+import os
+
+from pytest import raises
+
+from jedi import Script, Session, EvaluationCancelled
+
+
+def completion_names(source, session, path=None):
+    return [c.name for c in Script(source, path=path, session=session).completions()]
+
+
+def test_evaluator_is_reused():
+    session = Session()
+    first = Script('import json; json.', session=session)
+    first.completions()
+    second = Script('import json; json.lo', session=session)
+    assert first._evaluator is second._evaluator
+    assert 'json' in second._evaluator.modules
+
+
+def test_same_results_as_without_session():
+    session = Session()
+    source = 'import os; os.path.jo'
+    for _ in range(3):
+        assert completion_names(source, session) == completion_names(source, None)
+
+
+def test_buffer_module_is_always_invalidated():
+    session = Session()
+    assert completion_names('def spam_a(): pass\nspam_', session) == ['spam_a']
+    assert completion_names('def spam_b(): pass\nspam_', session) == ['spam_b']
+
+
+def test_changed_module_on_disk(tmpdir, monkeypatch):
+    module = tmpdir.join('session_mod.py')
+    module.write('def first(): pass\n')
+    path = str(tmpdir.join('main.py'))
+    source = 'import session_mod; session_mod.'
+
+    session = Session()
+    monkeypatch.chdir(str(tmpdir))
+    assert 'first' in completion_names(source, session, path)
+
+    module.write('def second(): pass\n')
+    # Make sure the mtime really changes, even on coarse file systems.
+    mtime = os.path.getmtime(str(module)) + 10
+    os.utime(str(module), (mtime, mtime))
+    names = completion_names(source, session, path)
+    assert 'second' in names
+    assert 'first' not in names
+
+
+def test_cancelled_request_is_not_cached():
+    source = 'import json; json.JSONDecoder().deco'
+    checks = []
+
+    def is_cancelled():
+        checks.append(1)
+        return len(checks) > 1
+
+    session = Session()
+    script = Script(source, session=session, is_cancelled=is_cancelled)
+    with raises(EvaluationCancelled):
+        script.completions()
+    assert completion_names(source, session) == completion_names(source, None)
+
+
+def test_cancelled_request_leaves_no_active_statements():
+    source = 'def f(a):\n    b = a\n    return b\nx = f(1)\nx.re'
+    checks = []
+
+    def is_cancelled():
+        checks.append(1)
+        return len(checks) > 5
+
+    script = Script(source, session=Session(), is_cancelled=is_cancelled)
+    with raises(EvaluationCancelled):
+        script.completions()
+    evaluator = script._evaluator
+    assert evaluator.recursion_detector.current is None
+    assert not evaluator.recursion_detector._active
+    assert evaluator.execution_recursion_detector.recursion_level == 0
+
+
+def test_partial_results_are_not_cached():
+    source = 'import json; json.JSONDecoder().deco'
+    session = Session()
+    script = Script(source, session=session, deadline_ms=0)
+    assert script.completions() == []
+    assert script.is_partial
+
+    script = Script(source, session=session, deadline_ms=10 ** 6)
+    assert [c.name for c in script.completions()] == ['decode']
+    assert not script.is_partial
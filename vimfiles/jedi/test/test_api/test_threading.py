@@ -0,0 +1,92 @@
+"""
+Scripts that are evaluated in parallel threads.
+"""
+import threading
+
+from jedi import Script, RequestSettings, settings
+
+
+SOURCES = [
+    'import json; json.JSONDecoder().deco',
+    'import os; os.path.jo',
+    'def f(a):\n    return a\nf("").upp',
+    'x = []\nx.append(1)\nx[0].rea',
+    'import collections; collections.OrderedDict().ite',
+]
+
+
+def completion_names(source, path, **kwargs):
+    return [c.name for c in Script(source, path=path, **kwargs).completions()]
+
+
+def test_parallel_scripts(tmpdir):
+    paths = [str(tmpdir.join('thread_%s.py' % i)) for i in range(len(SOURCES))]
+    expected = [completion_names(s, p) for s, p in zip(SOURCES, paths)]
+    results = {}
+
+    def complete(i):
+        for _ in range(3):
+            results.setdefault(i, []).append(completion_names(SOURCES[i], paths[i]))
+
+    threads = [threading.Thread(target=complete, args=(i,))
+               for i in range(len(SOURCES))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i, names in enumerate(expected):
+        assert results[i] == [names] * 3
+
+
+def test_request_settings():
+    source = 'def f(a):\n    a.upp\nf("")'
+
+    def names(**kwargs):
+        return [c.name for c in Script(source, 2, 9, **kwargs).completions()]
+
+    assert names() == ['upper']
+    request_settings = RequestSettings(dynamic_params=False)
+    assert names(request_settings=request_settings) == []
+    assert settings.dynamic_params
+    assert names() == ['upper']
+
+
+def test_call_signatures_with_request_settings(tmpdir):
+    """Threads with different settings don't share cached call signatures."""
+    source = 'def f(a):\n    return a.upper(1)\nf("")'
+    path = str(tmpdir.join('signatures.py'))
+    start = threading.Event()
+    results = {}
+
+    def call_signatures(dynamic_params):
+        request_settings = RequestSettings(dynamic_params=dynamic_params)
+        start.wait()
+        for _ in range(5):
+            script = Script(source, 2, 20, path, request_settings=request_settings)
+            names = [s.name for s in script.call_signatures()]
+            results.setdefault(dynamic_params, []).append(names)
+
+    threads = [threading.Thread(target=call_signatures, args=(dynamic_params,))
+               for dynamic_params in (True, False)]
+    for t in threads:
+        t.start()
+    start.set()
+    for t in threads:
+        t.join()
+    assert results == {True: [['upper']] * 5, False: [[]] * 5}
+
+
+def test_request_settings_changed():
+    request_settings = RequestSettings(max_executions=3)
+    with request_settings.changed(max_executions=5, dynamic_params=False):
+        assert request_settings.max_executions == 5
+        assert request_settings.dynamic_params is False
+    assert request_settings.max_executions == 3
+    assert request_settings.dynamic_params is settings.dynamic_params
+
+
+def test_usages_keep_global_settings():
+    script = Script('a = 1\nif isinstance(a, int):\n    a', 3, 4)
+    assert len(script.usages()) == 3
+    assert settings.dynamic_flow_information
+    assert script._evaluator.settings.dynamic_flow_information
@@ -0,0 +1,45 @@
+"""
+Tests for ``jedi.api.warmup``.
+"""
+import os
+
+import pytest
+
+from jedi import cache, warm_cache
+from jedi.api.warmup import find_modules
+
+
+def create_project(tmpdir):
+    tmpdir.join('main.py').write('import pkg\n')
+    tmpdir.mkdir('pkg').join('__init__.py').write('def foo(): pass\n')
+    tmpdir.mkdir('__pycache__').join('ignored.py').write('')
+    tmpdir.mkdir('.git').join('ignored.py').write('')
+    return [str(tmpdir.join('main.py')), str(tmpdir.join('pkg', '__init__.py'))]
+
+
+def test_find_modules(tmpdir):
+    modules = create_project(tmpdir)
+    paths = [str(tmpdir), str(tmpdir.join('pkg'))]
+    assert sorted(find_modules(paths)) == sorted(modules)
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+@pytest.mark.parametrize('processes', [1, 2])
+def test_warm_cache(tmpdir, processes):
+    modules = create_project(tmpdir.mkdir('project'))
+    calls = []
+
+    def progress(done, total, path):
+        calls.append((done, total, path))
+
+    assert warm_cache([str(tmpdir)], processes, progress) == 2
+    assert sorted(path for _, _, path in calls) == sorted(modules)
+    assert [(done, total) for done, total, _ in calls] == [(1, 2), (2, 2)]
+
+    for path in modules:
+        parser = cache.ParserPickling.load_parser(path, os.path.getmtime(path))
+        assert parser.module.path == path
+        cache.parser_cache.pop(path)
+
+    # Everything is cached now.
+    assert warm_cache([str(tmpdir)], processes) == 0
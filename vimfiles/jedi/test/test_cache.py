@@ -2,6 +2,7 @@
 Test all things related to the ``jedi.cache`` module.
 """
 
+import os
 import time
 
 import pytest
@@ -62,6 +63,92 @@ def test_modulepickling_delete_incompatible_cache():
     assert cached2 is None
 
 
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_shared_index():
+    """
+    Saving appends to the index, other instances (processes) read the new
+    entries incrementally.
+    """
+    items = [ParserCacheItem('fake parser %s' % i) for i in range(3)]
+    cache1 = ParserPicklingCls()
+    cache2 = ParserPicklingCls()
+    cache1.save_parser('fake path 0', items[0])
+    assert load_stored_item(cache2, 'fake path 0', items[0]) == 'fake parser 0'
+
+    cache1.save_parser('fake path 1', items[1])
+    cache1.save_parser('fake path 2', items[2])
+    for i, item in enumerate(items):
+        path = 'fake path %s' % i
+        assert load_stored_item(cache2, path, item) == item.parser
+
+    with open(cache1._get_path('index.log')) as f:
+        assert len(f.readlines()) == 4  # version + 3 entries
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_ignores_foreign_record():
+    item = ParserCacheItem('fake parser')
+    cache = ParserPicklingCls()
+    cache.save_parser('fake path 1', item)
+    offset, length = cache._index['fake path 1'][1:3]
+    # An index entry that points to the record of another module.
+    cache._append_index([('fake path 2', item.change_time, offset, length,
+                          None)])
+    assert load_stored_item(cache, 'fake path 2', item) is None
+    assert load_stored_item(cache, 'fake path 1', item) == item.parser
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_compaction(monkeypatch):
+    cache = ParserPicklingCls()
+    cache.save_parser('other path', ParserCacheItem('other parser'))
+    monkeypatch.setattr(cache, 'compact_threshold', 0)
+    for i in range(10):
+        item = ParserCacheItem('fake parser %s' % i)
+        cache.save_parser('fake path', item)
+
+    assert load_stored_item(cache, 'fake path', item) == 'fake parser 9'
+    assert cache.load_parser('other path', None) == 'other parser'
+    with open(cache._get_path('index.log')) as f:
+        assert len(f.readlines()) <= 4
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_source_hash_survives_touch(tmpdir):
+    """
+    ``git checkout`` and friends change the modification time, but not the
+    content of files.
+    """
+    mtimes = iter(range(10, 100, 10))
+
+    def touch():
+        # Always newer than the last touch, even after writing.
+        mtime = time.time() + next(mtimes)
+        os.utime(path, (mtime, mtime))
+
+    path = str(tmpdir.join('touched.py'))
+    with open(path, 'w') as f:
+        f.write('a = 1\n')
+    try:
+        cache.save_parser(path, 'fake parser')
+        touch()
+        assert cache.load_parser(path) == 'fake parser'
+
+        del cache.parser_cache[path]
+        touch()
+        assert cache.load_parser(path) == 'fake parser'
+        del cache.parser_cache[path]
+        assert cache.load_parser(path) == 'fake parser'
+
+        del cache.parser_cache[path]
+        with open(path, 'w') as f:
+            f.write('a = 2\n')
+        touch()
+        assert cache.load_parser(path) is None
+    finally:
+        cache.parser_cache.pop(path, None)
+
+
 @pytest.mark.skipif('True', message='Currently the star import cache is not enabled.')
 def test_star_import_cache_duration():
     new = 0.01
@@ -107,3 +194,29 @@ def test_cache_call_signatures():
 def test_cache_line_split_issues():
     """Should still work even if there's a newline."""
     assert jedi.Script('int(\n').call_signatures()[0].name == 'int'
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_source_hash_of_parsed_bytes(tmpdir):
+    """The hash belongs to the source that was parsed, not to the file."""
+    path = str(tmpdir.join('changed.py'))
+    with open(path, 'w') as f:
+        f.write('a = 2\n')
+    try:
+        cache.save_parser(path, 'fake parser', source=b'a = 1\n')
+        assert cache.parser_cache[path].source_hash == cache.hash_source(b'a = 1\n')
+    finally:
+        cache.parser_cache.pop(path, None)
+
+
+def test_cache_call_signatures_shared_by_scripts():
+    """Scripts of one thread with the same settings share call signatures."""
+    dct = cache._time_caches['call_signatures_validity']
+    dct.clear()
+    for _ in range(2):
+        assert jedi.Script('str(', 1, 4, 'boo').call_signatures()[0].name == 'str'
+    assert len(dct) == 1
+
+    request_settings = jedi.RequestSettings(dynamic_params=False)
+    jedi.Script('str(', 1, 4, 'boo', request_settings=request_settings).call_signatures()
+    assert len(dct) == 2
@@ -0,0 +1,68 @@
+"""
+Tests for the dependency tracking of ``jedi.evaluate.cache.MemoizeCache``.
+"""
+import os
+
+from jedi import Script, Session
+from jedi.evaluate import representation as er
+
+
+def test_invalidate_module_keeps_other_results():
+    script = Script('import json; json.', session=Session())
+    script.completions()
+    cache = script._evaluator.memoize_cache
+    json_path = script._evaluator.modules['json'].path
+    assert cache._dependents[None]
+    assert cache._dependents[json_path]
+
+    json_results = set(cache._dependents[json_path]) - cache._dependents[None]
+    cache.invalidate_module(None)
+    assert None not in cache._dependents
+    for function, key in json_results:
+        assert key in cache[function]
+
+
+def test_transitive_dependency(tmpdir, monkeypatch):
+    tmpdir.join('cache_a.py').write('from cache_b import value\n')
+    module_b = tmpdir.join('cache_b.py')
+    module_b.write('value = 1\n')
+    monkeypatch.chdir(str(tmpdir))
+
+    session = Session()
+    source = 'import cache_a; cache_a.value.'
+    path = str(tmpdir.join('main.py'))
+
+    def completions():
+        return [c.name for c in Script(source, path=path, session=session).completions()]
+
+    assert 'real' in completions()
+    module_b.write('value = ""\n')
+    mtime = os.path.getmtime(str(module_b)) + 10
+    os.utime(str(module_b), (mtime, mtime))
+    names = completions()
+    assert 'upper' in names
+    assert 'real' not in names
+
+
+def test_no_tracking_without_session():
+    script = Script('import json; json.')
+    script.completions()
+    cache = script._evaluator.memoize_cache
+    assert cache and not cache._dependents
+    cache.invalidate_module(None)
+    assert not cache
+
+
+def test_memoization_after_deadline():
+    script = Script('class C(object):\n    x = 1\nC().', deadline_ms=0)
+    assert script.completions() == []
+    evaluator = script._evaluator
+    assert evaluator.is_partial
+
+    # Only the results that were cut short are not stored.
+    cls = script._parser.module().subscopes[0]
+    assert er.Class(evaluator, cls) is er.Class(evaluator, cls)
+    assert not evaluator.eval_element(cls.name)
+    cut_steps = evaluator.memoize_cache.cut_steps
+    assert not evaluator.eval_element(cls.name)
+    assert evaluator.memoize_cache.cut_steps == cut_steps + 1
@@ -2,8 +2,12 @@
 Test compiled module
 """
 import os
+import sys
 
 import jedi
+from jedi import cache
+from jedi._compatibility import find_module
+from jedi.evaluate.compiled import stubs
 from ..helpers import cwd_at
 import pytest
 
@@ -26,6 +30,75 @@ def test_call_signatures_extension():
     assert len(sigs[0].params) == params
 
 
+def _not_imported_extension():
+    for name in '_sqlite3', '_bz2', '_lzma', 'audioop', '_curses', '_ctypes':
+        if name in sys.modules:
+            continue
+        try:
+            path = find_module(name)[1]
+        except ImportError:
+            continue
+        if stubs.is_extension(path):
+            return name, path
+    pytest.skip('No extension module that is not imported yet.')
+
+
+def test_extension_is_stubbed(isolated_jedi_cache, monkeypatch):
+    name, path = _not_imported_extension()
+    source = 'import %s; %s.' % (name, name)
+    names = [c.name for c in jedi.Script(source).completions()]
+    assert names
+    assert name not in sys.modules
+
+    # The stub is used until the extension changes.
+    def introspect(*args):
+        raise AssertionError('introspected again')
+
+    monkeypatch.setattr(stubs, '_introspect', introspect)
+    monkeypatch.setattr(cache.ParserPickling, 'load_parser', lambda *args: None)
+    cache.parser_cache.pop(path, None)
+    assert [c.name for c in jedi.Script(source).completions()] == names
+
+
+def test_new_stub_version(isolated_jedi_cache, monkeypatch):
+    name, path = _not_imported_extension()
+    jedi.Script('import %s' % name).goto_definitions()
+    rendered = []
+    monkeypatch.setattr(stubs, 'version', stubs.version + 1)
+    monkeypatch.setattr(stubs, 'render',
+                        lambda d: rendered.append(d) or 'new_stub_name = 1\n')
+    names = [c.name for c in jedi.Script('import %s; %s.' % (name, name)).completions()]
+    assert rendered
+    assert 'new_stub_name' in names
+
+
+def test_render_stub():
+    description = {'name': 'mod', 'doc': 'Doc.', 'members': [
+        {'name': 'B', 'kind': 'class', 'doc': None, 'bases': [['mod', 'A']],
+         'members': [{'name': 'size', 'kind': 'property', 'doc': None}]},
+        {'name': 'A', 'kind': 'class', 'doc': None,
+         'bases': [['builtins', 'object']], 'members': []},
+        {'name': 'f', 'kind': 'function', 'doc': 'f() -> int',
+         'params': [['a', '', None], ['b', '', '1'], ['c', '', None],
+                    ['args', '*', None], ['d', '', None], ['kw', '**', None]]},
+        {'name': 'g', 'kind': 'function', 'doc': 'g(x[, y])', 'params': None},
+        {'name': 'path', 'kind': 'module', 'module': 'os.path'},
+        {'name': 'D', 'kind': 'alias', 'ref': ['collections', 'OrderedDict']},
+        {'name': 'n', 'kind': 'value', 'literal': '3'},
+        {'name': 'lambda', 'kind': 'value', 'literal': '3'},
+    ]}
+    source = stubs.render(description)
+    compile(source, 'mod', 'exec')
+    assert source.index('class A(') < source.index('class B(A):')
+    assert 'def f(a, b=1, c=None, d=None, *args, **kw):' in source
+    assert '    return int()' in source
+    assert 'def g(x, y=None):' in source
+    assert 'import os.path as path' in source
+    assert 'import collections' in source
+    assert 'D = collections.OrderedDict' in source
+    assert 'lambda' not in source
+
+
 def test_call_signatures_stdlib():
     s = jedi.Script('import math; math.cos(')
     sigs = s.call_signatures()
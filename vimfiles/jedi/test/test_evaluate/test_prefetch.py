@@ -0,0 +1,63 @@
+"""
+Tests for ``jedi.evaluate.prefetch``.
+"""
+import pytest
+
+import jedi
+from jedi import settings
+from jedi.evaluate import prefetch
+from jedi.parser import load_grammar, Parser
+
+pytestmark = pytest.mark.skipif('prefetch.ProcessPoolExecutor is None')
+
+
+def create_project(tmpdir):
+    tmpdir.join('main.py').write('import pkg.sub\nfrom . import sibling\n'
+                                 'import not_existing\npkg.sub.')
+    pkg = tmpdir.mkdir('pkg')
+    pkg.join('__init__.py').write('')
+    pkg.join('sub.py').write('def prefetched(): pass\n')
+    tmpdir.join('sibling.py').write('')
+    return str(tmpdir.join('main.py'))
+
+
+def test_import_paths(tmpdir):
+    path = create_project(tmpdir)
+    with open(path) as f:
+        module = Parser(load_grammar(), f.read(), path).module
+    assert list(prefetch._import_paths(module)) == [
+        str(tmpdir.join('pkg', '__init__.py')),
+        str(tmpdir.join('pkg', 'sub.py')),
+        str(tmpdir.join('sibling.py')),
+    ]
+
+
+def test_prefetched_completions(tmpdir, monkeypatch):
+    path = create_project(tmpdir)
+    monkeypatch.setattr(settings, 'prefetch_imports', True)
+    # Otherwise modules might be handed over through the file system cache.
+    monkeypatch.setattr(settings, 'use_filesystem_cache', False)
+    loaded = []
+
+    def load_prefetched(path):
+        parser = load(path)
+        if parser is not None:
+            loaded.append(path)
+        return parser
+
+    load = prefetch.load_prefetched
+    monkeypatch.setattr(prefetch, 'load_prefetched', load_prefetched)
+    with open(path) as f:
+        source = f.read()
+    prefetch.prefetch_imports(Parser(load_grammar(), source, path).module)
+    # Don't let a module that is still queued be parsed in this process.
+    for future in prefetch._futures.values():
+        future.result()
+
+    script = jedi.Script(source, 4, len('pkg.sub.'), path)
+    try:
+        assert 'prefetched' in [c.name for c in script.completions()]
+    finally:
+        prefetch._futures.clear()
+    assert sorted(loaded) == [str(tmpdir.join('pkg', '__init__.py')),
+                              str(tmpdir.join('pkg', 'sub.py'))]
@@ -1,10 +1,11 @@
 from textwrap import dedent
+import pickle
 
 import jedi
 from jedi._compatibility import u
 from jedi import cache
 from jedi.parser import load_grammar
-from jedi.parser.fast import FastParser
+from jedi.parser.fast import FastParser, LazySuite
 
 
 def test_add_to_end():
@@ -113,6 +114,138 @@ def test_change_and_undo():
     check_fp('a', 1, 1)
 
 
+def test_incremental_split():
+    cache.parser_cache.pop(None, None)
+    funcs = ['def func%s():\n    return %s\n' % (i, i) for i in range(50)]
+    m = check_fp(''.join(funcs), 50)
+
+    funcs[25] = 'def func25():\n    return 25 + 1\n'
+    m = check_fp(''.join(funcs), 1, 50)
+    p = cache.parser_cache[None].parser
+    # Only the changed function and the one before it are split again.
+    assert p.number_of_lines_split == 4
+    assert m.subscopes[26].start_pos == (53, 0)
+
+    # New lines shift the positions of all the following functions.
+    funcs[25] += 'x = 3\n\n'
+    m = check_fp(''.join(funcs), 1, 51)
+    assert p.number_of_lines_split == 6
+    assert m.subscopes[26].start_pos == (55, 0)
+    assert m.subscopes[49].start_pos == (101, 0)
+
+
+def test_merged_names_are_updated():
+    def names(names_dict):
+        return dict((key, [n.start_pos for n in names_dict[key]])
+                    for key in names_dict)
+
+    def check(src, *args):
+        m = check_fp(src, *args)
+        # Compare against a module that is parsed from scratch.
+        fresh = FastParser(load_grammar(), u(src)).module
+        assert names(m.used_names) == names(fresh.used_names)
+        assert names(m.names_dict) == names(fresh.names_dict)
+        return m
+
+    cache.parser_cache.pop(None, None)
+    funcs = ['def func%s(a):\n    return a + %s\n' % (i, i) for i in range(5)]
+    m = check(''.join(funcs), 5)
+    assert [n.start_pos for n in m.used_names['a']] == \
+        [(i * 2 + l, c) for i in range(5) for l, c in [(1, 10), (2, 11)]]
+    assert m.used_names['missing'] == []
+
+    funcs[2] = 'def func2(b):\n    return b\n'
+    m = check(''.join(funcs), 1, 5)
+    assert len(m.used_names['a']) == 8
+    assert [n.start_pos for n in m.used_names['b']] == [(5, 10), (6, 11)]
+
+    # Removed and reordered functions.
+    del funcs[2]
+    m = check(''.join(funcs), 0, 4)
+    assert m.used_names['b'] == []
+    check(''.join(reversed(funcs)), 0, 4)
+
+
+def test_skeleton_parsing():
+    src = dedent(u('''\
+    import os
+
+    def first(a):
+        """Docstring."""
+        b = a + 1
+        return os.path.join(b)
+
+    class Cls(object):
+        def method(self, c=3):
+            if c:
+                return self.other(c)
+
+    def changes_global():
+        global x
+        x = 3
+
+    def one_liner(): return 1
+    '''))
+
+    def names(names_dict):
+        return sorted((key, [n.start_pos for n in names_dict[key]])
+                      for key in names_dict)
+
+    cache.parser_cache.pop(None, None)
+    full = FastParser(load_grammar(), src).module
+    cache.parser_cache.pop(None, None)
+    p = FastParser(load_grammar(), src, skeleton=True)
+    module = p.module
+    first, cls, changes_global, one_liner = module.subscopes
+    method = cls.subscopes[0]
+    lazy = module.lazy_suites
+    assert [s.parent for s in lazy] == [first, method]
+    assert not any(s.is_parsed() for s in lazy)
+    assert first.end_pos == (8, 0)
+
+    # Only the bodies that contain a name are parsed to look it up.
+    assert [n.start_pos for n in module.used_names['c']] == [(9, 21), (10, 11), (11, 30)]
+    assert not lazy[0].is_parsed() and lazy[1].is_parsed()
+
+    assert first.raw_doc == 'Docstring.'
+    assert names(first.names_dict) == names(full.subscopes[0].names_dict)
+    assert names(module.used_names) == names(full.used_names)
+    assert module.get_code() == src
+
+    # Unparsed bodies are pickled as source code.
+    cache.parser_cache.pop(None, None)
+    p = FastParser(load_grammar(), src, skeleton=True)
+    module = pickle.loads(pickle.dumps(p, 2)).module
+    assert not any(s.is_parsed() for s in module.lazy_suites)
+    # The grammar is loaded again by name to parse them.
+    assert b'symbol2number' not in pickle.dumps(module.lazy_suites, 2)
+    assert module.get_code() == src
+
+
+def test_skeleton_updates_keep_merged_names():
+    def names(names_dict):
+        return sorted((key, [n.start_pos for n in names_dict[key]])
+                      for key in names_dict)
+
+    funcs = ['def func%s(a):\n    return a + x%s\n' % (i, i) for i in range(4)]
+    cache.parser_cache.pop(None, None)
+    p = FastParser(load_grammar(), u(''.join(funcs)), skeleton=True)
+    used_names = p.module.used_names
+    assert len(used_names['x1']) == 1
+
+    funcs[2] = 'def func2(a):\n    return a + y\n'
+    p.update(u(''.join(funcs)))
+    # The index is updated, not built again.
+    assert p.module.used_names is used_names
+    assert [s.is_parsed() for s in p.module.lazy_suites] == [False, True, False, False]
+    assert [n.start_pos for n in used_names['y']] == [(6, 15)]
+    assert used_names['x2'] == []
+
+    cache.parser_cache.pop(None, None)
+    full = FastParser(load_grammar(), u(''.join(funcs))).module
+    assert names(used_names) == names(full.used_names)
+
+
 def test_positions():
     # Empty the parser cache for the path None.
     cache.parser_cache.pop(None, None)
@@ -438,3 +571,14 @@ def test_string_literals():
 
     script = jedi.Script(dedent(source))
     assert script.completions()
+
+
+def test_scope_searches_after_update():
+    """Reused scopes of the fast parser don't keep old searches."""
+    p = FastParser(load_grammar(), u('class C():\n    def f(self): pass\n'))
+    assert [s.name.value for s in p.module.subscopes[0].subscopes] == ['f']
+    p.update(u('class C():\n    def g(self): pass\n'))
+    assert [s.name.value for s in p.module.subscopes[0].subscopes] == ['g']
+    p.update(u('class C():\n    def g(self): pass\nimport os\n'))
+    assert [s.name.value for s in p.module.subscopes] == ['C']
+    assert len(p.module.imports) == 1
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
+import os
+import pickle
 import sys
 
+import pytest
+
 import jedi
 from jedi._compatibility import u, is_py3
 from jedi.parser import Parser, load_grammar
@@ -213,3 +217,170 @@ def test_backslash_dos_style():
     grammar = load_grammar()
     m = Parser(grammar, u('\\\r\n')).module
     assert m
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_grammar_tables_cache():
+    path = os.path.join(os.path.dirname(jedi.parser.__file__), 'grammar3.4.txt')
+    generated = jedi.parser._load_grammar_tables(path)
+    loaded = jedi.parser._load_grammar_tables(path)
+    assert loaded is not generated
+    assert loaded.__dict__ == generated.__dict__
+
+    # Broken tables are generated again.
+    tables_dir = os.path.join(jedi.settings.cache_directory,
+                              jedi.cache.ParserPickling.py_tag)
+    tables, = os.listdir(tables_dir)
+    with open(os.path.join(tables_dir, tables), 'wb') as f:
+        f.write(b'broken')
+    assert jedi.parser._load_grammar_tables(path).__dict__ == generated.__dict__
+
+
+@pytest.mark.parametrize('version', ['grammar3.4', 'grammar2.7'])
+def test_transitions_match_arc_search(version):
+    """The transition table must do what a search through the arcs does."""
+    from jedi.parser.pgen2.parse import make_transitions
+
+    def search(arcs, label):
+        for arc_label, newstate in arcs:
+            t, v = grammar.labels[arc_label]
+            if arc_label == label:
+                return newstate, None
+            elif t >= 256 and label in grammar.dfas[t][1]:
+                return newstate, t
+
+    grammar = load_grammar(version)
+    transitions = make_transitions(grammar)
+    # Only tokens are looked up, symbols are never passed to the parser.
+    token_labels = [label for label, (t, v) in enumerate(grammar.labels)
+                    if 0 < label and t < 256]
+    for symbol, (states, first) in grammar.dfas.items():
+        for state, arcs in enumerate(states):
+            for label in token_labels:
+                expected = search(arcs, label)
+                assert transitions[symbol][state].get(label) == expected
+
+
+def test_transitions_are_not_pickled():
+    """Parsers are pickled with their grammar, the table stays out of it."""
+    grammar = load_grammar()
+    Parser(grammar, u('a = 1\n'))
+    assert not hasattr(grammar, 'transitions')
+    # The tables alone are bigger than the rest of the grammar.
+    assert len(pickle.dumps(grammar, 2)) < 30000
+
+
+def test_position_lookups_match_linear_search():
+    """
+    The lookups bisect the children, they must find what a search through
+    all the children finds. The fast parser leaves empty end markers with
+    misleading positions in the tree, which are a special case.
+    """
+    from jedi.parser.fast import FastParser
+
+    def linear_name(node, pos):
+        for c in node.children:
+            if isinstance(c, pt.Leaf):
+                if isinstance(c, pt.Name) and c.start_pos <= pos <= c.end_pos:
+                    return c
+            else:
+                result = linear_name(c, pos)
+                if result is not None:
+                    return result
+
+    def leaves(node):
+        for c in getattr(node, 'children', []):
+            if isinstance(c, pt.Leaf):
+                yield c
+            else:
+                for leaf in leaves(c):
+                    yield leaf
+
+    source = u(dedent('''
+    import os
+
+    class Foo(object):
+        """docstring"""
+        def bar(self, a=(1,
+                         2)):
+            if a:
+                return [x for x in a]
+            class Inner():
+                pass
+            return os.path.join('a',
+                                'b')
+
+    @property
+    def baz():
+        return Foo().bar()
+    '''))
+    modules = Parser(load_grammar(), source).module, \
+        FastParser(load_grammar(), source).module
+    for module in modules:
+        positions = set()
+        for leaf in leaves(module):
+            positions.add(leaf.start_pos)
+            positions.add(leaf.end_pos)
+        for pos in positions:
+            assert module.name_for_position(pos) is linear_name(module, pos)
+            stmt = module.get_statement_for_position(pos)
+            if stmt is not None:
+                assert stmt.start_pos <= pos <= stmt.end_pos
+    stmt = modules[0].get_statement_for_position((12, 14))
+    assert stmt.get_code().strip().startswith('return os.path.join')
+
+
+def test_sibling_navigation():
+    module = Parser(load_grammar(), u('x = [a, b]\ny = c\n')).module
+    expr_stmt = module.children[0].children[0]
+    x, equals, atom = expr_stmt.children
+    assert x.prev_sibling() is None
+    assert x.next_sibling() is equals
+    assert equals.prev_sibling() is x
+    assert atom.children[-1].next_sibling() is None
+    # Crosses the borders of statements.
+    assert module.children[1].children[0].children[0].get_previous().value == '\n'
+
+    # The remembered indexes must not be trusted when the children change.
+    opening, testlist, closing = atom.children
+    atom.children.insert(0, testlist)
+    assert closing.prev_sibling() is testlist
+    assert opening.prev_sibling() is testlist
+    assert equals.next_sibling() is atom
+    expr_stmt.children.remove(equals)
+    assert x.next_sibling() is atom
+    assert equals.next_sibling() is None
+
+
+def test_scope_searches_are_cached():
+    module = Parser(load_grammar(), u('import os\ndef f(): pass\n')).module
+    assert module.imports is module.imports
+    assert [s.name.value for s in module.subscopes] == ['f']
+
+    # Changing the children needs a reset, like the fast parser does it.
+    other = Parser(load_grammar(), u('class C(): pass\nimport sys\n')).module
+    module.children[1:] = other.children[:-1]
+    assert [s.name.value for s in module.subscopes] == ['f']
+    module.clear_scope_index()
+    assert [s.name.value for s in module.subscopes] == ['C']
+    assert len(module.imports) == 2
+
+
+def test_compact_leaves():
+    source = u('def f(self):\n    self.x = self.' + 'y' * 5000 + '\n')
+    module = Parser(load_grammar(), source).module
+    names = module.used_names['self']
+    assert [n.start_pos for n in names] == [(1, 6), (2, 4), (2, 13)]
+    if is_py3:
+        # Equal names share one interned string.
+        assert names[1].value is names[2].value
+    assert module.used_names['y' * 5000][0].end_pos == (2, 5018)
+
+    leaf = names[0]
+    leaf.move(-1, 3)
+    assert leaf.start_pos == (0, 9)
+    leaf.position_modifier = pt.PositionModifier()
+    leaf.start_pos = 2, 0
+    assert leaf._start_pos == (2, 0)
+    leaf.position_modifier.line = 10
+    assert leaf.start_pos == (12, 0)
@@ -1,11 +1,13 @@
 # -*- coding: utf-8    # This file contains Unicode characters.
 
+import os
 from io import StringIO
 from textwrap import dedent
 
 import pytest
 
 from jedi._compatibility import u, is_py3
+from jedi.common import source_to_unicode
 from jedi.parser.token import NAME, OP, NEWLINE, STRING, INDENT
 from jedi.parser import Parser, load_grammar, tokenize
 
@@ -150,3 +152,32 @@ def test_ur_literals():
     # Must be in the right order.
     with pytest.raises(AssertionError):
         check('Rb""')
+
+
+def generate_tokens_from_lines(source):
+    return list(tokenize.generate_tokens(StringIO(source + '\n').readline))
+
+
+def test_buffer_tokenizer_edge_cases():
+    sources = ['', '"""', "'a\\\n", '\\', '\r', 'a$b', "x = '''a\\\n'''",
+               'def f():\n  """\n', 'rb"""a"""', 'print .5 ...', '\tif x:\r\n y']
+    for source in sources:
+        source = u(source)
+        assert list(tokenize.source_tokens(source)) == \
+            generate_tokens_from_lines(source)
+
+
+def test_buffer_tokenizer_same_as_line_tokenizer():
+    """
+    ``source_tokens`` scans the whole buffer at once, it must yield exactly
+    the same tokens as the line based ``generate_tokens``.
+    """
+    test_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for root, dirnames, filenames in os.walk(test_dir):
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            with open(os.path.join(root, filename), 'rb') as f:
+                source = source_to_unicode(f.read())
+            assert list(tokenize.source_tokens(source)) == \
+                generate_tokens_from_lines(source), filename
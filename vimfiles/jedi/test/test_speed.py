@@ -51,3 +51,17 @@ class TestSpeed(TestCase):
         with open('speed/precedence.py') as f:
             line = len(f.read().splitlines())
         assert jedi.Script(line=line, path='speed/precedence.py').goto_definitions()
+
+    @_check_speed(0.3)
+    @cwd_at('test')
+    def test_independent_executions(self):
+        """
+        Functions that don't use their params share the body between their
+        executions, a call chain doesn't evaluate every level again for each
+        call site.
+        """
+        with open('speed/executions.py') as f:
+            line = len(f.read().splitlines())
+        script = jedi.Script(line=line, path='speed/executions.py')
+        assert 'hex' in [c.name for c in script.completions()]
+        assert script._evaluator.execution_recursion_detector.execution_count < 20
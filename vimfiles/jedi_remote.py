@@ -1,14 +1,31 @@
 import json
 import os
 import sys
+import threading
+import zlib
+try:
+    import queue
+except ImportError:
+    import Queue as queue  # Python 2
 
-# add path for jedi
-sys.path.append(
-    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jedi'))
+# add path for jedi, the bundled version has to win over an installed one
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jedi'))
 
 import jedi
 
 
+class BufferOutOfSync(Exception):
+    """
+    The client sent a diff against a buffer version that is not known here.
+    It has to send the whole buffer again.
+    """
+
+
+def buffer_checksum(lines):
+    return zlib.crc32('\n'.join(lines).encode('utf-8')) & 0xffffffff
+
+
 class PoorRPC(object):
     def __init__(self, input=None, output=None):
         if input is None:
@@ -21,34 +38,204 @@ class PoorRPC(object):
         self.output = output
 
         self.script = None
+        self.session = jedi.Session()
+        self.completions = []
+        self.completions_generation = 0
+        self.buffers = {}  # path -> {version: lines}
+
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._output_lock = threading.Lock()
+        self._latest_id = None
+        self._pending_ids = set()
+        self._cancelled_ids = set()
+        self._running = None  # (request id, threading.Event)
 
     def run(self):
+        """
+        Reads the requests and executes them in a worker thread.
+
+        Requests like ``{"id": 1, "calls": [...]}`` can be cancelled: A newer
+        request with an id or ``{"cancel": 1}`` stops them between two
+        evaluation steps. Only the latest request is computed to completion,
+        but the buffer changes of all requests are applied.
+
+        Requests that can't be read or executed are answered with
+        ``{"id": ..., "code": "ng", "message": ...}``.
+        """
+        worker = threading.Thread(target=self._work)
+        worker.daemon = True
+        worker.start()
+
         for line in iter(self.input.readline, ''):
-            data = json.loads(line)
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                self._write_output(_error(None, e))
+                continue
+
+            if isinstance(data, dict) and 'cancel' in data:
+                self._cancel(data['cancel'])
+                continue
+            if isinstance(data, dict) and 'id' in data:
+                with self._lock:
+                    self._pending_ids.add(data['id'])
+                if self._latest_id is not None:
+                    self._cancel(self._latest_id)
+                self._latest_id = data['id']
+            self._requests.put(data)
 
+        self._requests.put(None)
+        worker.join()
+
+    def _work(self):
+        for data in iter(self._requests.get, None):
+            # An error must not kill the worker, the client would wait forever.
             try:
-                func = getattr(self, 'func_' + data['func'])
-                ret = func(*data['args'], **data['kwargs'])
+                if isinstance(data, list):
+                    self._write_output(self._call_batch(data))
+                elif 'id' not in data:
+                    self._write_output(self._call(data))
+                else:
+                    self._write_output(self._call_cancellable(data))
             except Exception as e:
-                result = {'code': 'ng', 'message': repr(e)}
+                request_id = data.get('id') if isinstance(data, dict) else None
+                self._write_output(_error(request_id, e))
+
+    def _call_cancellable(self, data):
+        request_id = data['id']
+        cancelled = threading.Event()
+        with self._lock:
+            if request_id in self._cancelled_ids:
+                cancelled.set()
+            self._running = request_id, cancelled
+
+        try:
+            if cancelled.is_set():
+                # The client counts on the buffer changes of cancelled
+                # requests, the next diff is made against them.
+                self._call_batch([c for c in data['calls']
+                                  if c['func'] in ('set_buffer', 'update_buffer')])
             else:
-                result = {'code': 'ok', 'return': ret}
+                results = self._call_batch(data['calls'])
+        finally:
+            with self._lock:
+                self._running = None
+                self._pending_ids.discard(request_id)
+                self._cancelled_ids.discard(request_id)
 
-            self._write_output(result)
+        if cancelled.is_set():
+            return {'id': request_id, 'code': 'cancelled'}
+        return {'id': request_id, 'code': 'ok', 'return': results}
+
+    def _cancel(self, request_id):
+        with self._lock:
+            if request_id not in self._pending_ids:
+                return  # Already answered.
+            self._cancelled_ids.add(request_id)
+            if self._running is not None and self._running[0] == request_id:
+                self._running[1].set()
+
+    def _is_cancelled(self):
+        running = self._running
+        return running is not None and running[1].is_set()
+
+    def _call(self, data):
+        try:
+            func = getattr(self, 'func_' + data['func'])
+            ret = func(*data['args'], **data['kwargs'])
+        except Exception as e:
+            return {'code': 'ng', 'message': repr(e)}
+        else:
+            return {'code': 'ok', 'return': ret}
+
+    def _call_batch(self, calls):
+        """
+        Executes the calls in order and returns all results at once. Later
+        calls usually depend on earlier ones (e.g. ``set_script``), therefore
+        the batch stops at the first error.
+        """
+        results = []
+        for data in calls:
+            result = self._call(data)
+            results.append(result)
+            if result['code'] != 'ok':
+                break
+        return results
 
     def _write_output(self, data):
-        self.output.write(json.dumps(data))
-        self.output.write('\n')
-        self.output.flush()
+        data = json.dumps(data)
+        # Unreadable requests are answered by the reading thread.
+        with self._output_lock:
+            self.output.write(data)
+            self.output.write('\n')
+            self.output.flush()
 
     def func_set_additional_dynamic_modules(self, modules):
         jedi.settings.additional_dynamic_modules = modules
 
     def func_set_script(self, *args, **kwargs):
-        self.script = jedi.Script(*args, **kwargs)
+        self.script = jedi.Script(*args, session=self.session,
+                                  is_cancelled=self._is_cancelled, **kwargs)
+
+    def func_set_buffer(self, path, version, lines):
+        self.buffers[path] = {version: lines}
+
+    def func_update_buffer(self, path, base_version, version, start, end,
+                           lines, checksum):
+        """
+        Replaces the lines ``start:end`` of the buffer version
+        ``base_version`` with ``lines``.
 
-    def func_completions(self):
-        return [_completion2dict(c) for c in self.script.completions()]
+        ``base_version`` is the last version the client got an answer for or
+        cancelled, the older versions are dropped.
+        """
+        versions = self.buffers.get(path, {})
+        try:
+            base_lines = versions[base_version]
+        except KeyError:
+            raise BufferOutOfSync(path)
+
+        buffer_lines = base_lines[:start] + lines + base_lines[end:]
+        if buffer_checksum(buffer_lines) != checksum:
+            raise BufferOutOfSync(path)
+        for old_version in [v for v in versions if v < base_version]:
+            del versions[old_version]
+        versions[version] = buffer_lines
+
+    def func_set_buffer_script(self, line, column, path, encoding):
+        versions = self.buffers[path]
+        lines = versions[max(versions)]
+        self.script = jedi.Script('\n'.join(lines), line, column, path,
+                                  encoding, session=self.session,
+                                  is_cancelled=self._is_cancelled)
+
+    def func_completions(self, resolve=True):
+        """
+        With ``resolve=False`` only the names are returned, together with a
+        handle for ``resolve_completion``. Finding the docstrings and
+        descriptions of e.g. all ``numpy`` completions takes a long time.
+        """
+        self.completions = self.script.completions()
+        self.completions_generation += 1
+        result = []
+        for i, comp in enumerate(self.completions):
+            d = _obj2dict(comp, 'name', 'complete')
+            d['handle'] = '%s:%s' % (self.completions_generation, i)
+            if resolve:
+                d.update(_resolve_completion(comp))
+            result.append(d)
+        return result
+
+    def func_resolve_completion(self, handle):
+        """
+        Returns the description and docstring of a completion of the last
+        ``completions`` call, or None if the handle is stale.
+        """
+        generation, index = map(int, handle.split(':'))
+        if generation != self.completions_generation:
+            return None
+        return _resolve_completion(self.completions[index])
 
     def func_call_signatures(self):
         return [_signiture2dict(s) for s in self.script.call_signatures()]
@@ -63,8 +250,12 @@ class PoorRPC(object):
         return [_definition2dict(d) for d in self.script.usages()]
 
 
-def _completion2dict(comp):
-    d = _obj2dict(comp, 'name', 'complete', 'description')
+def _error(request_id, exception):
+    return {'id': request_id, 'code': 'ng', 'message': repr(exception)}
+
+
+def _resolve_completion(comp):
+    d = _obj2dict(comp, 'description')
     d['docstring'] = comp.docstring()
 
     return d
@@ -11,12 +11,19 @@ import os
 import platform
 import subprocess
 import sys
+import threading
+import time
+import zlib
 from shlex import split as shsplit
 from contextlib import contextmanager
 try:
     from itertools import zip_longest
 except ImportError:
     from itertools import izip_longest as zip_longest  # Python 2
+try:
+    import queue
+except ImportError:
+    import Queue as queue  # Python 2
 
 
 is_py3 = sys.version_info[0] >= 3
@@ -144,6 +151,8 @@ class JediRemote(object):
 
     def __init__(self):
         self._process = None
+        self._responses = None
+        self._request_id = 0
 
     def __del__(self):
         if self._process is not None:
@@ -174,6 +183,12 @@ class JediRemote(object):
                 stderr=stderr,
                 startupinfo=si,
             )
+            self._responses = queue.Queue()
+            reader = threading.Thread(target=_read_lines,
+                                      args=(self._process.stdout,
+                                            self._responses))
+            reader.daemon = True
+            reader.start()
 
         return self._process
 
@@ -183,35 +198,195 @@ class JediRemote(object):
             self._process = None
 
     def _call(self, func, *args, **kwargs):
-        data = json.dumps({'func': func, 'args': args, 'kwargs': kwargs})
+        return self.batch([rpc_call(func, *args, **kwargs)])[0]
+
+    def batch(self, calls, timeout=None):
+        """
+        Executes a list of calls (see :func:`rpc_call`) in one round trip and
+        returns their return values.
+
+        If there's no answer after ``timeout`` seconds, the request is
+        cancelled on the server and :class:`RequestCancelled` is raised.
+        Sending a new request cancels the older ones as well.
+        """
+        self._request_id += 1
+        request_id = self._request_id
+        self._send({'id': request_id, 'calls': calls})
+        responses = self._responses  # The process might have been restarted.
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+        while True:
+            try:
+                if timeout is None:
+                    line = responses.get()
+                else:
+                    line = responses.get(
+                        timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                self._send({'cancel': request_id})
+                raise RequestCancelled('timed out')
+            if line is None:
+                raise Exception('%s exited' % self.remote_cmd)
+
+            ret = json.loads(line.decode('utf-8'), object_hook=ObjectDict)
+            # Answers to requests that timed out earlier are dropped.
+            if ret['id'] == request_id:
+                break
+
+        if ret['code'] == 'cancelled':
+            raise RequestCancelled('cancelled')
+        if ret['code'] == 'ng':
+            raise Exception(ret['message'])
+        return [self._result(r) for r in ret['return']]
+
+    def _send(self, data):
+        data = json.dumps(data)
         self.process.stdin.write(data.encode('utf-8'))
         self.process.stdin.write(b'\n')
         self.process.stdin.flush()
 
-        ret = json.loads(self.process.stdout.readline().decode('utf-8'),
-                         object_hook=ObjectDict)
-
+    def _result(self, ret):
         if ret['code'] == 'ok':
             return ret['return']
 
         elif ret['message'].startswith('jedi.api.NotFoundError'):
             raise jedi.NotFoundError()
 
+        elif ret['message'].startswith('BufferOutOfSync'):
+            raise BufferOutOfSync(ret['message'])
+
         else:
             raise Exception(ret['message'])
 
-@catch_and_print_exceptions
-def set_script(source=None, column=None):
-    jedi_remote.set_additional_dynamic_modules(
-        [b.name for b in vim.buffers if b.name is not None and b.name.endswith('.py')])
+
+def _read_lines(stdout, responses):
+    for line in iter(stdout.readline, b''):
+        responses.put(line)
+    responses.put(None)
+
+
+class BufferOutOfSync(Exception):
+    pass
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+def rpc_call(func, *args, **kwargs):
+    return {'func': func, 'args': args, 'kwargs': kwargs}
+
+
+class BufferSync(object):
+    """
+    Remembers which version of each buffer the remote server knows, so that
+    only the changed lines have to be sent.
+
+    A version is only known after the server answered or cancelled the
+    request that sent it (see :meth:`acknowledge`). Until then the diffs are
+    made against the last known version.
+    """
+    def __init__(self):
+        self._buffers = {}  # path -> (version, lines), known by the server
+        self._sent = {}  # path -> (version, lines), not answered yet
+        self._version = 0
+
+    def call(self, path, lines):
+        """
+        Returns the call that brings the remote copy of the buffer ``path`` up
+        to date with ``lines``.
+        """
+        self._version += 1
+        try:
+            base_version, old_lines = self._buffers[path]
+        except KeyError:
+            old_lines = None
+        self._sent[path] = self._version, lines
+
+        if old_lines is None:
+            return rpc_call('set_buffer', path, self._version, lines)
+
+        start = 0
+        max_start = min(len(old_lines), len(lines))
+        while start < max_start and old_lines[start] == lines[start]:
+            start += 1
+        end = 0
+        max_end = max_start - start
+        while end < max_end and old_lines[-end - 1] == lines[-end - 1]:
+            end += 1
+        return rpc_call('update_buffer', path, base_version, self._version,
+                        start, len(old_lines) - end,
+                        lines[start:len(lines) - end], buffer_checksum(lines))
+
+    def acknowledge(self, path):
+        """
+        The server answered the last call for ``path`` with ``ok`` or the
+        request was cancelled, the server applies the buffer changes of
+        cancelled requests as well.
+        """
+        try:
+            self._buffers[path] = self._sent.pop(path)
+        except KeyError:
+            pass
+
+    def forget(self, path):
+        self._buffers.pop(path, None)
+        self._sent.pop(path, None)
+
+
+def buffer_checksum(lines):
+    return zlib.crc32('\n'.join(lines).encode('utf-8')) & 0xffffffff
+
+
+def script_calls(source=None, column=None):
+    """
+    Returns the calls that prepare the remote script for the current buffer.
+    """
     if source is None:
-        source = '\n'.join(vim.current.buffer)
+        lines = list(vim.current.buffer)
+    else:
+        lines = source.split('\n')
     row = vim.current.window.cursor[0]
     if column is None:
         column = vim.current.window.cursor[1]
     buf_path = vim.current.buffer.name
     encoding = vim_eval('&encoding') or 'latin1'
-    jedi_remote.set_script(source, row, column, buf_path, encoding)
+    return [
+        rpc_call('set_additional_dynamic_modules',
+                 [b.name for b in vim.buffers
+                  if b.name is not None and b.name.endswith('.py')]),
+        buffer_sync.call(buf_path, lines),
+        rpc_call('set_buffer_script', row, column, buf_path, encoding),
+    ]
+
+
+def script_batch(calls=(), source=None, column=None, timeout=None):
+    """
+    Prepares the remote script for the current buffer and executes ``calls``
+    in the same round trip. Returns the return values of ``calls``.
+    """
+    buf_path = vim.current.buffer.name
+    prepare = script_calls(source, column)
+    try:
+        try:
+            results = jedi_remote.batch(prepare + list(calls), timeout)
+        except BufferOutOfSync:
+            # The server doesn't know the buffer (e.g. because it was
+            # restarted), send the whole buffer.
+            buffer_sync.forget(buf_path)
+            prepare = script_calls(source, column)
+            results = jedi_remote.batch(prepare + list(calls), timeout)
+    except RequestCancelled:
+        buffer_sync.acknowledge(buf_path)
+        raise
+    buffer_sync.acknowledge(buf_path)
+    return results[len(prepare):]
+
+
+@catch_and_print_exceptions
+def set_script(source=None, column=None):
+    script_batch(source=source, column=column)
 
 
 class ObjectDict(dict):
@@ -223,6 +398,7 @@ class ObjectDict(dict):
 
 
 jedi_remote = JediRemote()
+buffer_sync = BufferSync()
 
 
 @catch_and_print_exceptions
@@ -266,24 +442,38 @@ def completions():
             source += '\n'
         # here again hacks, because jedi has a different interface than vim
         column += len(base)
+        # The docstrings are fetched when an item is selected, see
+        # resolve_completion.
+        lazy = lazy_completion_info()
         try:
-            set_script(source=source, column=column)
-            completions = jedi_remote.completions()
-            signatures = jedi_remote.call_signatures()
+            completions, signatures = script_batch(
+                [rpc_call('completions', resolve=not lazy),
+                 rpc_call('call_signatures')],
+                source=source, column=column, timeout=completions_timeout())
 
             out = []
             for c in completions:
                 d = dict(word=PythonToVimStr(c.name[:len(base)] + c.complete),
                          abbr=PythonToVimStr(c.name),
-                         # stuff directly behind the completion
-                         menu=PythonToVimStr(c.description),
-                         info=PythonToVimStr(c.docstring),  # docstr
                          icase=1,  # case insensitive
                          dup=1  # allow duplicates (maybe later remove this)
                          )
+                if lazy:
+                    d['user_data'] = PythonToVimStr(c.handle)
+                    # Vim only creates the info popup for items with info.
+                    d['info'] = PythonToVimStr(' ')
+                else:
+                    # stuff directly behind the completion
+                    d['menu'] = PythonToVimStr(c.description)
+                    d['info'] = PythonToVimStr(c.docstring)  # docstr
                 out.append(d)
 
             strout = str(out)
+        except RequestCancelled:
+            # Don't block the editor, the next keystroke will try again.
+            strout = ''
+            completions = []
+            signatures = []
         except Exception:
             # print to stdout, will be in :messages
             print(traceback.format_exc())
@@ -295,6 +485,43 @@ def completions():
         vim.command('return ' + strout)
 
 
+def completions_timeout():
+    timeout = int(vim_eval('g:jedi#completions_timeout')) / 1000.0
+    return timeout or None
+
+
+def lazy_completion_info():
+    return vim_eval("has('patch-8.1.1880') && has('textprop') && "
+                    "&completeopt =~# 'popuphidden'") == '1'
+
+
+@_check_jedi_availability(show_error=False)
+@catch_and_print_exceptions
+def resolve_completion():
+    """
+    Shows the docstring of the selected completion in the hidden info popup.
+    """
+    handle = vim_eval("get(v:event.completed_item, 'user_data', '')")
+    popup = vim_eval('popup_findinfo()')
+    if not handle or popup == '0':
+        return
+
+    try:
+        info = jedi_remote.batch([rpc_call('resolve_completion', handle)],
+                                 completions_timeout())[0]
+    except RequestCancelled:
+        return
+    if info is None or not (info.description or info.docstring):
+        return
+
+    lines = [info.description]
+    if info.docstring:
+        lines += [''] + info.docstring.split('\n')
+    vim_command('call popup_settext(%s, [%s])' % (
+        popup, ', '.join(repr(PythonToVimStr(l)) for l in lines)))
+    vim_command('call popup_show(%s)' % popup)
+
+
 @contextmanager
 def tempfile(content):
     # Using this instead of the tempfile module because Windows won't read
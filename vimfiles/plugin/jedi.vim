@@ -19,7 +19,12 @@ if !exists("g:jedi#auto_vim_configuration") || g:jedi#auto_vim_configuration
     let s:default_completeopt=&completeopt
     let &completeopt=s:save_completeopt
     if s:default_completeopt == &completeopt
-        set completeopt=menuone,longest,preview
+        if has('patch-8.1.1880') && has('textprop')
+            " The docstrings are fetched when an item is selected.
+            set completeopt=menuone,longest,popuphidden
+        else
+            set completeopt=menuone,longest,preview
+        endif
     endif
 
     if len(mapcheck('<C-c>', 'i')) == 0
@@ -0,0 +1,31 @@
+source plugin/jedi.vim
+
+describe 'buffer sync'
+    before
+        new
+        set filetype=python
+        silent! exe 'file '.tempname().'.py'
+    end
+
+    after
+        bd!
+    end
+
+    it 'sends diffs after cancelled requests'
+        call setline(1, ['import os'])
+        PythonJedi jedi_vim.set_script()
+
+        " The server applies the change of the cancelled request, the next
+        " request only sends its own change.
+        call setline(2, ['xyz = 1'])
+        PythonJedi exec("try:\n jedi_vim.script_batch([jedi_vim.rpc_call('completions')], timeout=0)\nexcept jedi_vim.RequestCancelled:\n jedi_vim.vim.command('let g:cancelled = 1')")
+        Expect g:cancelled == 1
+        PythonJedi jedi_vim.vim.command('let g:known = %d' % (jedi_vim.buffer_sync._buffers[jedi_vim.vim.current.buffer.name][0] == jedi_vim.buffer_sync._version))
+        Expect g:known == 1
+
+        call setline(3, ['xy'])
+        call cursor(3, 2)
+        PythonJedi jedi_vim.vim.command('let g:names = %r' % [str(c['name']) for c in jedi_vim.script_batch([jedi_vim.rpc_call('completions')])[0]])
+        Expect g:names == ['xyz']
+    end
+end